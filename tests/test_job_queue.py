@@ -0,0 +1,75 @@
+"""
+공유 작업 큐 테스트.
+
+같은 컴퓨터의 여러 프로세스가 _download_via_queue로 한 큐를 나눠 처리할 때 같은 작업을 두 번 처리하지 않고,
+임대 묶음마다 새로 만들어지는 작업 스레드의 sqlite 연결이 쌓이지 않는지 확인합니다.
+다운로드는 실제로 하지 않고 처리한 작업 키만 기록합니다.
+"""
+import multiprocessing
+import os
+
+import tidal_downloader_core as core
+
+JOB_COUNT = 300
+WORKER_COUNT = 4
+MAX_CONNECTIONS = 4  # 작업이 끝난 뒤 남아도 되는 연결 수 (주 스레드 등)
+MAX_FD_GROWTH = 8  # 큐를 모두 처리한 뒤 늘어나도 되는 파일 디스크립터 수
+
+def _open_fds():
+    """열린 파일 디스크립터 수 (확인할 수 없는 플랫폼에서는 None)"""
+    for fd_dir in ("/proc/self/fd", "/dev/fd"):
+        if os.path.isdir(fd_dir):
+            return len(os.listdir(fd_dir))
+    return None
+
+def _drain(queue_path, results):
+    processed = []
+
+    def fake_download_track(t, idx, *args, **kwargs):
+        processed.append(core._schedule_key(t))
+        return True, None
+
+    core._download_track = fake_download_track
+    limiters = {name: core.AdaptiveLimiter(name, limit=4, max_limit=4, interval=0, min_interval=0)
+                for name in ("search", "download")}
+    job_queue = core.JobQueue(queue_path)
+    fds_before = _open_fds()
+    core._download_via_queue(job_queue, "tidal-dl-ng", {}, os.path.dirname(queue_path), lambda msg: None,
+                             None, None, limiters)
+    fds_after = _open_fds()
+    connections = len(job_queue._connections)
+    job_queue.close()
+    results.put({"processed": processed, "connections": connections,
+                 "fd_growth": None if fds_before is None else fds_after - fds_before})
+
+def test_workers_share_queue_without_duplicates(tmp_path):
+    queue_path = str(tmp_path / core.JOB_QUEUE_FILE_NAME)
+    job_queue = core.JobQueue(queue_path)
+    tracks = [core.TrackRecord(f"v{i:04d}", f"title {i}", "artist") for i in range(JOB_COUNT)]
+    keys = [core._schedule_key(t) for t in tracks]
+    assert job_queue.enqueue([(key, core._job_payload(t), i) for i, (key, t) in enumerate(zip(keys, tracks))]) \
+        == JOB_COUNT
+    job_queue.close()
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    workers = [context.Process(target=_drain, args=(queue_path, results)) for _ in range(WORKER_COUNT)]
+    for worker in workers:
+        worker.start()
+    reports = [results.get(timeout=120) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=30)
+        assert worker.exitcode == 0
+
+    processed = [key for report in reports for key in report["processed"]]
+    assert sorted(processed) == sorted(keys), "모든 작업을 정확히 한 번씩 처리해야 합니다"
+    for report in reports:
+        assert report["connections"] <= MAX_CONNECTIONS
+        if report["fd_growth"] is not None:
+            assert report["fd_growth"] <= MAX_FD_GROWTH
+
+    job_queue = core.JobQueue(queue_path)
+    try:
+        assert job_queue.counts() == {"done": JOB_COUNT}
+    finally:
+        job_queue.close()
@@ -0,0 +1,65 @@
+"""
+로컬 라이브러리 매칭 회귀 테스트.
+
+match_corpus.json의 (YouTube 제목/아티스트, 로컬 파일명) 쌍으로 normalize()와 LocalLibrary.match가
+한글/일본어/악센트/전각 제목과 채널 이름(noise token)이 붙은 곡을 이미 받은 곡으로 찾는지 확인합니다.
+정규화 결과가 빈 문자열이 되어 같은 곡을 다시 받는 문제가 되풀이되지 않도록 합니다.
+"""
+import json
+import os
+
+import pytest
+
+import tidal_downloader_core as core
+
+CORPUS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "match_corpus.json")
+MATCH_THRESHOLD = 0.5  # 동기화에서 사용하는 기준값
+
+with open(CORPUS_FILE, "r", encoding="utf-8") as f:
+    CORPUS = json.load(f)
+
+def _case_id(entry):
+    return f"{entry['case']}:{entry['title']}"
+
+@pytest.fixture(autouse=True)
+def default_normalizer():
+    """환경 변수(NOISE_TOKENS, TRANSLITERATE)와 상관없이 기본 정규화 설정으로 실행"""
+    saved = dict(core._normalizer_config)
+    core.configure_normalizer(noise_tokens=core.DEFAULT_NOISE_TOKENS, transliterate=False)
+    yield
+    core._normalizer_config.update(saved)
+    core.normalize.cache_clear()
+
+@pytest.fixture
+def library(tmp_path):
+    tracks_path = tmp_path / "Tracks"
+    tracks_path.mkdir()
+    for entry in CORPUS:
+        if entry["file"]:
+            (tracks_path / entry["file"]).write_bytes(b"")
+    return core.LocalLibrary(str(tmp_path))
+
+@pytest.mark.parametrize("entry", CORPUS, ids=_case_id)
+def test_normalize_keeps_title(entry):
+    normalized = core.normalize(entry["title"])
+    assert normalized, "정규화 결과가 비어 있으면 로컬 파일과 매칭할 수 없습니다"
+    if "normalized" in entry:
+        assert normalized == entry["normalized"]
+
+@pytest.mark.parametrize("entry", CORPUS, ids=_case_id)
+def test_library_match(entry, library):
+    record = core.TrackRecord(None, entry["title"], entry["artist"])
+    found = library.match(record, MATCH_THRESHOLD, lambda msg: None)
+    if entry["file"] is None:
+        assert found is None
+    else:
+        assert found is not None, "이미 받은 곡을 찾지 못해 다시 다운로드하게 됩니다"
+        assert found[0] == entry["file"]
+
+def test_noise_token_is_required_for_match(library):
+    """채널 이름을 제거하지 않으면 매칭되지 않는 경우 (noise token 설정이 실제로 쓰이는지 확인)"""
+    entry = next(e for e in CORPUS if e["case"] == "noise-token")
+    core.configure_normalizer(noise_tokens=[])
+    record = core.TrackRecord(None, entry["title"], entry["artist"])
+    assert core.LocalLibrary(os.path.dirname(library.tracks_path)).match(record, MATCH_THRESHOLD,
+                                                                          lambda msg: None) is None
@@ -2,20 +2,42 @@ import os
 import re
 import json
 import time
+import uuid
 import base64
+import hashlib
+import mmap
+import queue
+import shutil
+import socket
+import sys
+import sqlite3
+import tempfile
+import unicodedata
+import urllib.parse
+import cProfile
+import pstats
+import tracemalloc
+from functools import lru_cache
+import selectors
+import threading
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 import requests
 import Levenshtein
 from ytmusicapi import YTMusic
 from mutagen import File as MutagenFile
 from pathlib import Path
 
+try:
+    from unidecode import unidecode  # 선택 사항: 음역(transliteration)용
+except ImportError:
+    unidecode = None
+
 # gettext 관련 에러 방지
 try:
     import builtins
     builtins.__dict__['_'] = lambda x: x
     
-    import sys
     if 'gettext' in sys.modules:
         import gettext
         gettext.translation = lambda *args, **kwargs: type('DummyTranslation', (), {
@@ -26,16 +48,132 @@ except Exception:
     pass  # 실패해도 계속 진행
 
 DEBUG = False  # 디버그 로그 출력 여부
+AUDIO_EXTENSIONS = ('.mp3', '.flac', '.wav', '.m4a')
+STAGING_DIR_NAME = ".staging"  # Tracks 와 같은 파일 시스템에 두는 작업별 다운로드 디렉토리
+STAGING_MAX_AGE = 12 * 3600  # 소유 프로세스를 확인할 수 없는 스테이징 디렉토리의 보존 시간 (초)
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".tidal_downloader_cache")  # 실행 간 유지되는 캐시/상태
+RATE_STATE_FILE = os.path.join(CACHE_DIR, "rate_state.json")
+TIDAL_DL_CONFIG_CACHE_FILE = os.path.join(CACHE_DIR, "tidal_dl_config.json")  # `tidal-dl-ng cfg` 결과 캐시
+YTMUSIC_CACHE_DIR = os.path.join(CACHE_DIR, "ytmusic")  # 플레이리스트 페이지 캐시
+YTMUSIC_CACHE_MAX_AGE = 7 * 86400  # 이 기간이 지나면 페이지 캐시를 처음부터 다시 검증 (초)
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, "snapshots")  # 플레이리스트별 마지막 동기화 상태
+TIDAL_METADATA_FILE = os.path.join(CACHE_DIR, "tidal_tracks.json")  # TIDAL 트랙 속성 캐시
+TIDAL_METADATA_MAX_AGE = 30 * 86400  # 트랙 속성 캐시 유효 기간 (초)
+TIDAL_METADATA_BATCH = 20  # filter[id] 한 번에 조회할 수 있는 최대 트랙 수
+TIDAL_SEARCH_CANDIDATES = 5  # 검색 결과 중 점수를 매길 상위 후보 수
+TIDAL_CANDIDATE_MARGIN = 0.25  # 첫 번째 검색 결과 대신 다른 후보를 고르려면 필요한 최소 점수 차이
+TIDAL_DURATION_TOLERANCE = 5  # 이 정도 재생 시간 차이는 일치로 취급 (YouTube 영상의 인트로 등, 초)
+SCHEDULE_FILE = os.path.join(CACHE_DIR, "schedule.json")  # 트랙별 재시도 일정
+SCHEDULE_BACKOFF = {"rate_limited": 600, "error": 300}  # 실패 유형별 재시도 기본 대기 시간 (초)
+SCHEDULE_MAX_BACKOFF = 7 * 86400  # 재시도 대기 시간 상한 (초)
+SCHEDULE_PARK_DURATION = 30 * 86400  # TIDAL에 없는 곡을 다시 검색하기까지의 기간 (초)
+JOB_QUEUE_FILE_NAME = ".tidal_jobs.sqlite3"  # 여러 작업자가 공유하는 작업 큐 (트랙 디렉토리에 위치)
+# SQLite 파일 잠금을 신뢰할 수 없는 네트워크 파일 시스템 (공유 작업 큐를 만들지 않음)
+NETWORK_FS_TYPES = ("nfs", "nfs4", "cifs", "smb", "smb2", "smb3", "smbfs", "afpfs", "9p",
+                    "fuse.sshfs", "fuse.rclone", "ceph", "glusterfs", "davfs", "webdav")
+JOB_LEASE_SECONDS = 300  # 작업 임대 기간 - 이 시간 동안 갱신이 없으면 다른 작업자가 가져감 (초)
+JOB_HEARTBEAT_INTERVAL = 60  # 임대 갱신 주기 (초)
+JOB_POLL_INTERVAL = 10  # 다른 작업자가 처리 중인 작업을 기다릴 때 확인 주기 (초)
+JOB_PRIORITY_BAND = 1_000_000  # 공유 작업 큐 우선순위 구간 - 우선 재생목록(pin) 작업은 한 구간 앞에서 임대됨
+JOB_DONE_RETENTION = 6 * 3600  # 완료된 작업을 다시 넣지 않는 기간 - 이후에는 로컬 파일이 없으면 다시 다운로드 (초)
+MATCH_INDEX_FILE_NAME = ".match_index.json"  # 라이브러리 파일 색인과 매칭 결과 기록 (Tracks 폴더에 위치)
+MATCH_INDEX_VERSION = 1
+PROVENANCE_FILE_NAME = ".provenance.json"  # 파일별 TIDAL 트랙 ID와 원본 재생목록 항목 (Tracks 폴더에 위치)
+AUDIO_HASH_FILE_NAME = ".audio_hashes.json"  # 중복 검사용 오디오 데이터 해시 (Tracks 폴더에 위치)
+AUDIO_HASH_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024  # 해시 계산 시 한 번에 읽는 크기
+DEDUP_MAX_WORKERS = 8
+DEDUP_ACTIONS = ("report", "hardlink", "remove")
+PLAN_FILE = "download_plan.json"  # dry run으로 저장하는 동기화 계획
+PLAN_VERSION = 1
+LOSSLESS_BITRATE = 1411200  # 예상 용량 계산에 쓰는 LOSSLESS(16bit/44.1kHz 스테레오) 비트레이트 (bps)
+PLAN_DEFAULT_DURATION = 240  # 재생 시간을 모르는 곡의 예상 길이 (초)
+PLAN_DEFAULT_THROUGHPUT = 2 * 1024 * 1024  # 처리량 기록이 없을 때 가정하는 다운로드 속도 (bytes/sec)
+PROFILE_ENV = "TIDAL_DOWNLOADER_PROFILE"  # 1로 설정하면 프로파일링 모드로 실행
+PROFILE_SAMPLE_INTERVAL = 0.01  # 스레드 스택 샘플링 주기 (초)
+PROFILE_TRACEMALLOC_FRAMES = 10  # 메모리 할당마다 기록할 호출 스택 깊이
+PROFILE_TOP_N = 40  # 텍스트 요약에 남길 상위 항목 수
+RESOLVED_STATES = ("local", "downloaded")  # 변경분 동기화에서 다시 처리하지 않는 상태
+
+def _write_json_atomic(path, data):
+    """같은 디렉토리의 임시 파일에 기록한 뒤 교체하여 JSON 파일을 원자적으로 저장"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+DEFAULT_NOISE_TOKENS = ('ukf drum and bass',)  # 매칭 전에 제거할 채널/레이블 이름
+NORMALIZE_VERSION = 2  # 정규화 방식이 바뀌면 증가 (로컬 트랙 캐시 무효화)
+NORMALIZE_SEPARATORS = frozenset('&/()[]')  # 공백으로 바꾸는 구분 문자 (나머지 기호는 제거)
+
+def _fold(text):
+    """NFKC 정규화 + casefold (전각/호환 문자, 대소문자 차이 제거)"""
+    return unicodedata.normalize("NFKC", text).casefold()
+
+_normalizer_config = {
+    "noise_tokens": tuple(_fold(t).strip() for t in os.getenv("NOISE_TOKENS", ",".join(DEFAULT_NOISE_TOKENS)).split(",") if t.strip()),
+    "transliterate": os.getenv("TRANSLITERATE", "0") == "1",
+}
+
+def configure_normalizer(noise_tokens=None, transliterate=None):
+    """
+    normalize()의 동작을 설정합니다. 설정이 바뀌면 정규화 캐시를 비웁니다.
+
+    Args:
+        noise_tokens (list): 매칭 전에 제거할 문구 목록 (예: 채널 이름)
+        transliterate (bool): unidecode가 설치된 경우 라틴 문자로 음역할지 여부
+    """
+    if noise_tokens is not None:
+        _normalizer_config["noise_tokens"] = tuple(_fold(t).strip() for t in noise_tokens if t.strip())
+    if transliterate is not None:
+        _normalizer_config["transliterate"] = bool(transliterate)
+    normalize.cache_clear()
+
+def normalizer_signature():
+    """정규화 결과를 캐시할 때 함께 저장하는 버전/설정 식별자"""
+    transliterate = _normalizer_config["transliterate"] and unidecode is not None
+    raw = json.dumps([NORMALIZE_VERSION, _normalizer_config["noise_tokens"], transliterate])
+    return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+def _strip_latin_accents(text):
+    """라틴 문자에 붙은 발음 구별 기호만 제거 (é → e). 가나의 탁점 등 다른 문자의 결합 기호는 유지"""
+    decomposed = unicodedata.normalize("NFD", text)
+    kept = []
+    for ch in decomposed:
+        if unicodedata.category(ch) == "Mn" and kept and ord(kept[-1]) < 0x250:
+            continue
+        kept.append(ch)
+    return unicodedata.normalize("NFC", "".join(kept))
 
+@lru_cache(maxsize=65536)
 def normalize(text):
-    text = text.lower()
-    text = text.replace('&', ' ')
-    text = text.replace('/', ' ')
-    text = text.replace('(', ' ').replace(')', ' ')
-    text = text.replace('ukf drum and bass', '')
-    text = re.sub(r'[^a-z0-9\s]', '', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    """
+    매칭용으로 문자열을 정규화합니다.
+
+    유니코드 문자(한글, 가나, 한자, 악센트 문자 등)는 유지하고 대소문자/전각/악센트 차이와
+    기호를 제거합니다. 같은 문자열이 반복해서 들어오므로 결과를 캐시합니다.
+    """
+    text = _fold(text)
+    for token in _normalizer_config["noise_tokens"]:
+        text = text.replace(token, ' ')
+    text = _strip_latin_accents(text)
+    if _normalizer_config["transliterate"] and unidecode is not None:
+        text = unidecode(text).lower()
+    chars = []
+    for ch in text:
+        if ch in NORMALIZE_SEPARATORS or ch.isspace():
+            chars.append(' ')
+        elif unicodedata.category(ch)[0] in "LNM":
+            chars.append(ch)
+    return re.sub(r'\s+', ' ', "".join(chars)).strip()
 
 def similar(a, b):
     if not a or not b:
@@ -67,6 +205,17 @@ def get_tidal_access_token(client_id, client_secret, logger):
         logger(f"❌ 액세스 토큰 요청 실패: {response.status_code} {response.text}")
         return None
 
+def _local_track_names(filename):
+    """로컬 파일명을 매칭용 정규화 이름으로 변환 (원래 순서, 구분자 앞뒤를 이어 붙인 순서)"""
+    name = os.path.splitext(filename)[0]
+    norm1 = normalize(name)
+    if ' - ' in name:
+        parts = name.split(' - ')
+        norm2 = normalize(f"{parts[0]} {parts[1]}")  # 곡명 아티스트 순서로 변경
+    else:
+        norm2 = norm1
+    return norm1, norm2
+
 def get_tracks_from_directory(track_dir):
     # Tracks 폴더가 없는 경우를 대비한 경로 처리
     tracks_path = os.path.join(track_dir, "Tracks")
@@ -84,11 +233,12 @@ def get_tracks_from_directory(track_dir):
             dir_mtime = os.path.getmtime(tracks_path)
             
             # 폴더 수정 시간이 캐시보다 오래된 경우 캐시 사용 (24시간 내)
-            if dir_mtime < cache_mtime and (time.time() - cache_mtime) < 86400:  # 24시간
+            if dir_mtime <= cache_mtime and (time.time() - cache_mtime) < 86400:  # 24시간
                 with open(cache_file, 'r', encoding='utf-8') as f:
-                    cached_tracks = json.load(f)
-                    if cached_tracks and isinstance(cached_tracks, list):
-                        return set(cached_tracks)
+                    cached = json.load(f)
+                    # 정규화 방식이 다른 캐시(이전 버전의 리스트 형식 포함)는 사용하지 않음
+                    if isinstance(cached, dict) and cached.get("normalizer") == normalizer_signature():
+                        return set(cached.get("tracks", []))
         except Exception:
             pass  # 캐시 파일 문제 시 무시하고 계속 진행
         
@@ -97,32 +247,224 @@ def get_tracks_from_directory(track_dir):
 
     for filename in files:
         if filename.lower().endswith(('.mp3', '.flac', '.wav', '.m4a')):
-            name = os.path.splitext(filename)[0]
-            norm1 = normalize(name)
-            if ' - ' in name:
-                parts = name.split(' - ')
-                norm2 = normalize(f"{parts[0]} {parts[1]}")  # 곡명 아티스트 순서로 변경
-            else:
-                norm2 = norm1
+            norm1, norm2 = _local_track_names(filename)
             if DEBUG:
                 print(f"[LOCAL] {filename} → norm1: {norm1} / norm2: {norm2}")
             track_set.add(norm1)
             track_set.add(norm2)
     
-    # 캐시 저장
+    # 캐시 저장 - 여러 프로세스가 동시에 써도 깨지지 않도록 원자적으로 교체
     try:
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(list(track_set), f)
+        _write_json_atomic(cache_file, {"normalizer": normalizer_signature(), "tracks": list(track_set)})
+        os.utime(cache_file, None)  # 교체로 갱신된 폴더 수정 시간보다 늦게 표시
     except Exception:
         pass  # 캐시 저장 실패는 무시
             
     return track_set
 
-def get_tracks_from_ytmusic(playlist_url, logger):
+class TrackRecord:
+    """
+    플레이리스트 트랙 하나를 나타내는 가벼운 레코드.
+
+    대용량 플레이리스트에서도 메모리를 적게 쓰도록 __slots__만 두고, 매칭 패턴은 필요할 때 계산합니다.
+    기존 코드와 같이 t['title'] 형태의 접근도 지원합니다.
+    """
+    __slots__ = ("video_id", "title", "artist", "duration")
+
+    def __init__(self, video_id, title, artist, duration=None):
+        self.video_id = video_id
+        self.title = title
+        self.artist = artist
+        self.duration = duration  # 초 단위 (알 수 없으면 None)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    @property
+    def key(self):
+        """스냅샷에서 트랙을 식별하는 키 (videoId가 없는 곡은 제목/아티스트)"""
+        return self.video_id or f"{self.title} - {self.artist}"
+
+    @property
+    def patterns(self):
+        return [normalize(f"{self.title} - {self.artist}"), normalize(f"{self.artist} - {self.title}")]
+
+    def to_dict(self):
+        return {"video_id": self.video_id, "title": self.title, "artist": self.artist, "duration": self.duration}
+
+def _find_first(obj, key):
+    """중첩된 dict/list에서 key의 첫 번째 값을 찾음 (YouTube 응답 구조 변경에 대비)"""
+    if isinstance(obj, dict):
+        if key in obj:
+            return obj[key]
+        values = obj.values()
+    elif isinstance(obj, list):
+        values = obj
+    else:
+        return None
+    for value in values:
+        found = _find_first(value, key)
+        if found is not None:
+            return found
+    return None
+
+def _fetch_ytmusic_page(ytmusic, playlist_id, token=None):
+    """
+    플레이리스트 한 페이지(최대 100곡)를 가져옵니다.
+
+    Args:
+        token (dict): 이전 페이지의 continuation 토큰 정보. None이면 첫 페이지
+
+    Returns:
+        tuple: (트랙 튜플 목록, 다음 페이지 토큰 정보 또는 None, 전체 트랙 수 힌트 또는 None)
+    """
+    from ytmusicapi.parsers.playlists import parse_playlist_items
+
+    body = {"browseId": f"VL{playlist_id}"}
+    if token is None:
+        response = ytmusic._send_request("browse", body)
+    elif token["legacy"]:
+        response = ytmusic._send_request("browse", body, f"&ctoken={token['token']}&continuation={token['token']}")
+    else:
+        response = ytmusic._send_request("browse", {"continuation": token["token"]})
+
+    shelf = _find_first(response, "musicPlaylistShelfRenderer") or _find_first(response, "musicPlaylistShelfContinuation")
+    if shelf is not None:
+        items = shelf.get("contents", [])
+    else:
+        items = _find_first(response, "continuationItems") or []
+    if token is None and shelf is None and not items:
+        raise ValueError("플레이리스트 응답에서 트랙 목록을 찾을 수 없습니다.")
+
+    tracks = []
+    song_items = [item for item in items if "musicResponsiveListItemRenderer" in item]
+    for item in parse_playlist_items(song_items):
+        artist = ", ".join(a['name'] for a in item.get('artists') or [])
+        tracks.append((item.get('videoId'), item['title'], artist, item.get('duration_seconds')))
+
+    next_token = None
+    command = _find_first(items, "continuationCommand")
+    if command:
+        next_token = {"token": command["token"], "legacy": False}
+    elif shelf is not None and _find_first(shelf, "nextContinuationData"):
+        next_token = {"token": _find_first(shelf, "nextContinuationData")["continuation"], "legacy": True}
+
+    track_count = None
+    if token is None:
+        subtitle = _find_first(response, "secondSubtitle")
+        runs = subtitle.get("runs", []) if isinstance(subtitle, dict) else []
+        for run in runs:
+            digits = re.sub(r'[^0-9]', '', run.get("text", ""))
+            if digits:
+                track_count = int(digits)
+                break
+    return tracks, next_token, track_count
+
+def _read_page_cache(cache_path, page_no):
+    with open(os.path.join(cache_path, f"page_{page_no:04d}.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _write_page_cache(cache_path, page_no, token, next_token, tracks):
+    _write_json_atomic(os.path.join(cache_path, f"page_{page_no:04d}.json"),
+                       {"token": token, "next": next_token, "tracks": tracks})
+
+def _iter_ytmusic_pages(ytmusic, playlist_id, logger):
+    """
+    플레이리스트 페이지를 (트랙 튜플 목록, 전체 트랙 수 힌트) 형태로 하나씩 반환합니다.
+
+    첫 페이지는 항상 새로 받아 캐시와 비교합니다 (변경 여부 확인용 지문).
+    첫 페이지가 같으면 캐시된 마지막 페이지도 저장된 토큰으로 다시 받아 비교합니다.
+    - 트랙 수가 같고 마지막 페이지도 같으면 나머지 페이지는 디스크 캐시에서 읽습니다.
+    - 트랙 수가 늘었고 마지막 페이지가 캐시된 내용으로 시작하면 (뒤에만 추가된 경우)
+      중간 페이지는 캐시에서 읽고 마지막 페이지부터 이어서 받습니다.
+    - 그 외(중간 삽입/삭제로 페이지 경계가 바뀐 경우 등)에는 처음부터 모든 페이지를 받아 캐시를 새로 씁니다.
+    """
+    cache_path = os.path.join(YTMUSIC_CACHE_DIR, re.sub(r'[^a-zA-Z0-9_-]', '_', playlist_id))
+    os.makedirs(cache_path, exist_ok=True)
+    index_file = os.path.join(cache_path, "index.json")
+    index = {}
+    try:
+        with open(index_file, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if time.time() - index.get("updated", 0) > YTMUSIC_CACHE_MAX_AGE:
+            index = {}
+    except Exception:
+        index = {}
+
+    tracks, next_token, track_count = _fetch_ytmusic_page(ytmusic, playlist_id)
+    tracks = [list(t) for t in tracks]
+    fingerprint = hashlib.sha1(json.dumps([t[0] for t in tracks]).encode()).hexdigest()
+    same_head = index.get("complete") and index.get("fingerprint") == fingerprint
+
+    _write_page_cache(cache_path, 0, None, next_token, tracks)
+    yield tracks, track_count
+    page_no = 1
+
+    cached_pages = index.get("pages", 0) if same_head else 0
+    pages_available = cached_pages > 1 and all(
+        os.path.exists(os.path.join(cache_path, f"page_{n:04d}.json")) for n in range(1, cached_pages))
+    cached_count = index.get("track_count") or 0
+
+    if pages_available and track_count is not None and track_count >= cached_count:
+        last_page = cached_pages - 1
+        cached_last = _read_page_cache(cache_path, last_page)
+        cached_ids = [t[0] for t in cached_last["tracks"]]
+        try:
+            fresh, fresh_next, _ = _fetch_ytmusic_page(ytmusic, playlist_id, cached_last["token"])
+            fresh = [list(t) for t in fresh]
+        except Exception:
+            fresh, fresh_next = None, None  # 토큰이 만료된 경우 등 - 전체를 다시 받음
+        fresh_ids = [t[0] for t in fresh] if fresh is not None else None
+        if track_count == cached_count:
+            unchanged = fresh_ids == cached_ids and not fresh_next
+        else:
+            unchanged = fresh_ids is not None and fresh_ids[:len(cached_ids)] == cached_ids
+
+        if unchanged:
+            if track_count == cached_count:
+                logger("[+] 변경 없는 플레이리스트 - 페이지 캐시 사용")
+            else:
+                logger(f"[+] 추가된 트랙만 가져오는 중... ({cached_count} → {track_count})")
+            for page_no in range(1, last_page):
+                yield _read_page_cache(cache_path, page_no)["tracks"], track_count
+            _write_page_cache(cache_path, last_page, cached_last["token"], fresh_next, fresh)
+            yield fresh, track_count
+            next_token = fresh_next
+            page_no = last_page + 1
+        else:
+            logger("[+] 플레이리스트 중간이 변경되어 전체 페이지를 다시 가져옵니다.")
+
+    while next_token:
+        token = next_token
+        tracks, next_token, _ = _fetch_ytmusic_page(ytmusic, playlist_id, token)
+        tracks = [list(t) for t in tracks]
+        _write_page_cache(cache_path, page_no, token, next_token, tracks)
+        yield tracks, track_count
+        page_no += 1
+
+    _write_json_atomic(index_file, {
+        "fingerprint": fingerprint,
+        "track_count": track_count,
+        "pages": page_no,
+        "complete": True,
+        "updated": time.time(),
+    })
+
+def get_tracks_from_ytmusic(playlist_url, logger, status=None):
+    """
+    YouTube Music 플레이리스트의 트랙을 TrackRecord로 하나씩 반환하는 제너레이터.
+
+    전체 응답을 한 번에 메모리에 올리지 않고 페이지 단위로 가져오므로,
+    대용량 플레이리스트에서도 첫 트랙부터 바로 매칭을 시작할 수 있습니다.
+    status 딕셔너리가 주어지면 끝까지 오류 없이 읽었을 때 status["complete"]를 True로 설정합니다.
+    """
     match = re.search(r'list=([a-zA-Z0-9_-]+)', playlist_url)
     if not match:
         logger("❌ 유효하지 않은 유튜브 링크입니다.")
-        return []
+        return
 
     playlist_id = match.group(1)
     logger(f"[+] YTMusic에서 플레이리스트 '{playlist_id}' 로드 중...")
@@ -130,50 +472,457 @@ def get_tracks_from_ytmusic(playlist_url, logger):
     # 연결 타임아웃 설정
     ytmusic = YTMusic()
     
+    idx = 0
     try:
-        playlist = ytmusic.get_playlist(playlist_id, limit=None)
-        
-        if not playlist or 'tracks' not in playlist:
-            logger("❌ 플레이리스트를 불러올 수 없습니다. 공개 플레이리스트인지 확인하세요.")
-            return []
-        
-        track_count = len(playlist['tracks'])
-        logger(f"[+] 총 {track_count}개 트랙 발견")
+        try:
+            pages = _iter_ytmusic_pages(ytmusic, playlist_id, logger)
+            first_page = next(pages)
+        except Exception as e:
+            # 내부 API 응답 구조가 바뀐 경우 전체 로드 방식으로 대체
+            logger(f"⚠️ 페이지 단위 로드 실패, 전체 로드로 대체합니다: {e}")
+            playlist = ytmusic.get_playlist(playlist_id, limit=None)
+            if not playlist or 'tracks' not in playlist:
+                logger("❌ 플레이리스트를 불러올 수 없습니다. 공개 플레이리스트인지 확인하세요.")
+                return
+            first_page = ([(item.get('videoId'), item['title'], ", ".join([a['name'] for a in item['artists']]),
+                            item.get('duration_seconds')) for item in playlist['tracks']], len(playlist['tracks']))
+            del playlist
+            pages = iter(())
+
+        track_count = first_page[1]
+        logger(f"[+] 총 {track_count if track_count is not None else '?'}개 트랙 발견")
         
-        tracks = []
-        for idx, item in enumerate(playlist['tracks'], 1):
-            if idx % 20 == 0:  # 진행 상황 업데이트
-                logger(f"[+] 트랙 {idx}/{track_count} 처리 중...")
-                
-            title = item['title']
-            artist = ", ".join([a['name'] for a in item['artists']])
-            combined1 = f"{title} - {artist}"
-            combined2 = f"{artist} - {title}"
-            norm1 = normalize(combined1)
-            norm2 = normalize(combined2)
-            if DEBUG:
-                logger(f"[YT   ] {title} - {artist} → norm1: {norm1}, norm2: {norm2}")
-            tracks.append({
-                "title": title,
-                "artist": artist,
-                "patterns": [norm1, norm2]
-            })
-        return tracks
+        for page, _ in _chain_first(first_page, pages):
+            for video_id, title, artist, duration in page:
+                idx += 1
+                if idx % 20 == 0:  # 진행 상황 업데이트
+                    logger(f"[+] 트랙 {idx}/{track_count or '?'} 처리 중...")
+                record = TrackRecord(video_id, title, artist, duration)
+                if DEBUG:
+                    norm1, norm2 = record.patterns
+                    logger(f"[YT   ] {title} - {artist} → norm1: {norm1}, norm2: {norm2}")
+                yield record
+        if status is not None:
+            status["complete"] = True
     except Exception as e:
         logger(f"❌ YouTube Music API 오류: {e}")
-        return []
 
-def search_tidal_track(title, artist, headers, logger):
+def _chain_first(first, rest):
+    """이미 꺼낸 첫 항목과 나머지 이터레이터를 이어서 반환"""
+    yield first
+    yield from rest
+
+class AdaptiveLimiter:
+    """
+    AIMD(가산 증가/승산 감소) 방식으로 동시 실행 수와 요청 간격을 조절하는 리미터.
+
+    한 라운드(현재 동시 실행 수만큼의 성공) 동안 429가 없으면 동시 실행 수를 1 늘리고
+    요청 간격을 줄입니다. 429를 받으면 동시 실행 수를 절반으로, 간격을 두 배로 늘립니다.
+    동시에 보낸 요청들이 한꺼번에 429를 받아도 한 번만 줄이도록, 마지막 감소 이전에 시작된
+    요청의 429는 대기 시간에만 반영합니다.
+    지연 시간이 기준치보다 크게 늘었으면 증가를 보류하고, 동시 실행 수를 늘렸는데도
+    처리량(bytes/sec)이 떨어졌으면 한 단계 되돌립니다.
+    """
+
+    def __init__(self, name, limit=1, min_limit=1, max_limit=4,
+                 interval=1.0, min_interval=0.1, max_interval=30.0):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.limit = max(min_limit, min(int(limit), max_limit))
+        self.interval = max(min_interval, min(float(interval), max_interval))
+        self.safe_limit = self.limit
+        self.throughput = None  # bytes/sec 지수 이동 평균
+        self.latency = None  # 초 단위 지수 이동 평균
+        self.baseline_latency = None
+        self.requests = 0
+        self.throttled = 0
+        self._active = 0
+        self._last_start = 0.0
+        self._cooldown_until = 0.0
+        self._last_decrease = 0.0
+        self._round_successes = 0
+        self._round_bytes = 0
+        self._round_started = time.time()
+        self._prev_round_throughput = None
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_state(cls, name, state, **defaults):
+        """저장된 상태(state)에서 학습된 동시 실행 수와 간격으로 시작하는 리미터 생성"""
+        limiter = cls(name, **defaults)
+        if state:
+            limiter.limit = max(limiter.min_limit, min(int(state.get("safe_limit", limiter.limit)), limiter.max_limit))
+            limiter.safe_limit = limiter.limit
+            limiter.interval = max(limiter.min_interval,
+                                   min(float(state.get("interval", limiter.interval)), limiter.max_interval))
+            limiter.throughput = state.get("throughput")
+            limiter.baseline_latency = state.get("baseline_latency")
+        return limiter
+
+    def state(self):
+        """실행 간 유지할 상태"""
+        with self._cond:
+            return {
+                "safe_limit": self.safe_limit,
+                "interval": round(self.interval, 3),
+                "throughput": self.throughput,
+                "baseline_latency": self.baseline_latency,
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "updated": time.time(),
+            }
+
+    def acquire(self, stop_flag=None):
+        """
+        실행 슬롯을 얻을 때까지 대기합니다.
+
+        Returns:
+            bool: 슬롯을 얻었으면 True, 대기 중 중단 요청이 있으면 False
+        """
+        with self._cond:
+            while True:
+                if stop_flag and stop_flag():
+                    return False
+                now = time.time()
+                wait = max(self._cooldown_until - now, self._last_start + self.interval - now)
+                if self._active < self.limit and wait <= 0:
+                    self._active += 1
+                    self._last_start = now
+                    self.requests += 1
+                    return True
+                self._cond.wait(timeout=min(max(wait, 0.05), OUTPUT_POLL_INTERVAL))
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def record_success(self, latency, nbytes=0):
+        """성공한 요청의 지연 시간과 전송량을 반영"""
+        with self._cond:
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            if self.baseline_latency is None or latency < self.baseline_latency:
+                self.baseline_latency = latency
+            self._round_successes += 1
+            self._round_bytes += nbytes
+            if self._round_successes < self.limit:
+                return
+
+            # 한 라운드 완료 - 동시 실행 수 조정
+            elapsed = max(time.time() - self._round_started, 1e-6)
+            round_throughput = self._round_bytes / elapsed if self._round_bytes else None
+            if round_throughput:
+                self.throughput = (round_throughput if self.throughput is None
+                                   else 0.7 * self.throughput + 0.3 * round_throughput)
+
+            if self.latency > 2.5 * self.baseline_latency:
+                pass  # 지연 시간이 크게 늘었으면 증가 보류
+            elif (round_throughput and self._prev_round_throughput
+                  and round_throughput < 0.9 * self._prev_round_throughput
+                  and self.limit > self.min_limit):
+                self.limit -= 1  # 늘려도 처리량이 오르지 않음
+            else:
+                self.limit = min(self.max_limit, self.limit + 1)
+                self.interval = max(self.min_interval, self.interval * 0.75)
+            self.safe_limit = self.limit
+            self._prev_round_throughput = round_throughput
+            self._round_successes = 0
+            self._round_bytes = 0
+            self._round_started = time.time()
+            self._cond.notify_all()
+
+    def record_throttle(self, retry_after=None, started=None):
+        """
+        429 응답을 반영하여 동시 실행 수를 절반으로 줄이고 대기 시간을 늘림.
+
+        started(요청 시작 시각)가 마지막 감소보다 이전이면 이미 줄인 속도로 보낸 요청이 아니므로
+        다시 줄이지 않고 대기 시간만 반영합니다.
+        """
+        with self._cond:
+            self.throttled += 1
+            now = time.time()
+            if started is not None and started < self._last_decrease:
+                self._cooldown_until = max(self._cooldown_until, now + (retry_after or 0))
+                return
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit // 2)
+            self.safe_limit = self.limit
+            self.interval = min(self.max_interval, max(self.interval * 2, 0.5))
+            self._cooldown_until = max(self._cooldown_until, now + (retry_after if retry_after else self.interval))
+            self._round_successes = 0
+            self._round_bytes = 0
+            self._round_started = time.time()
+            self._prev_round_throughput = None
+
+    def backoff_remaining(self):
+        """429 이후 남은 대기 시간 (초)"""
+        return max(0.0, self._cooldown_until - time.time())
+
+def _rate_state_key(client_id):
+    """클라이언트 ID를 그대로 저장하지 않도록 해시한 키"""
+    return hashlib.sha256(client_id.encode()).hexdigest()[:16]
+
+def load_rate_limiters(client_id):
+    """
+    클라이언트 ID별로 저장된 상태에서 검색/다운로드 리미터를 생성합니다.
+
+    Returns:
+        dict: "search", "download" 키를 가진 AdaptiveLimiter 딕셔너리
+    """
+    saved = {}
+    try:
+        with open(RATE_STATE_FILE, "r", encoding="utf-8") as f:
+            saved = json.load(f).get(_rate_state_key(client_id), {})
+    except Exception:
+        pass  # 상태 파일이 없거나 손상된 경우 기본값으로 시작
+    return {
+        "search": AdaptiveLimiter.from_state("search", saved.get("search"), limit=2, max_limit=8, interval=0.5),
+        "download": AdaptiveLimiter.from_state("download", saved.get("download"), limit=1, max_limit=4, interval=1.0),
+    }
+
+def save_rate_limiters(client_id, limiters):
+    """학습된 리미터 상태를 클라이언트 ID별로 저장"""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        try:
+            with open(RATE_STATE_FILE, "r", encoding="utf-8") as f:
+                all_state = json.load(f)
+        except Exception:
+            all_state = {}
+        all_state[_rate_state_key(client_id)] = {name: l.state() for name, l in limiters.items()}
+        _write_json_atomic(RATE_STATE_FILE, all_state)
+    except Exception:
+        pass  # 상태 저장 실패는 무시
+
+def _retry_after_seconds(response):
+    """Retry-After 헤더 값 (초). 없거나 해석할 수 없으면 None"""
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+def parse_iso8601_duration(value):
+    """ISO 8601 재생 시간(예: PT3M45S)을 초 단위로 변환. 해석할 수 없으면 None"""
+    if not value:
+        return None
+    match = re.fullmatch(r'P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?)?', value)
+    if not match:
+        return None
+    days, hours, minutes, seconds = match.groups()
+    return (int(days or 0) * 86400 + int(hours or 0) * 3600 + int(minutes or 0) * 60
+            + float(seconds or 0))
+
+def _artist_names(resources):
+    """included 목록의 artists 리소스에서 아티스트 ID → 이름"""
+    return {str(item["id"]): (item.get("attributes") or {}).get("name")
+            for item in resources if item.get("type") == "artists" and item.get("id")}
+
+def _track_metadata_from_resource(item, artist_names=None):
+    """
+    TIDAL v2 tracks 리소스에서 필요한 속성만 추출.
+
+    artists에는 관계(relationships.artists)와 included의 아티스트 이름으로 찾은 이름 목록을,
+    이름을 모두 알 수 없으면 None을 기록합니다.
+    """
+    attributes = item.get("attributes", {})
+    artist_refs = ((item.get("relationships") or {}).get("artists") or {}).get("data")
+    artists = None
+    if artist_refs and artist_names:
+        artists = [artist_names.get(str(ref.get("id"))) for ref in artist_refs]
+        artists = artists if all(artists) else None
+    return {
+        "title": attributes.get("title"),
+        "artists": artists,
+        "version": attributes.get("version"),
+        "isrc": attributes.get("isrc"),
+        "duration": parse_iso8601_duration(attributes.get("duration")),
+        "explicit": attributes.get("explicit"),
+        "availability": attributes.get("availability") or [],
+        "media_tags": attributes.get("mediaTags") or [],
+        "fetched": time.time(),
+    }
+
+_tidal_metadata_cache = None
+_tidal_metadata_lock = threading.Lock()
+
+def _load_tidal_metadata_cache():
+    global _tidal_metadata_cache
+    if _tidal_metadata_cache is None:
+        try:
+            with open(TIDAL_METADATA_FILE, "r", encoding="utf-8") as f:
+                _tidal_metadata_cache = json.load(f)
+        except Exception:
+            _tidal_metadata_cache = {}
+    return _tidal_metadata_cache
+
+def store_tidal_track_metadata(resources):
+    """다른 응답(검색, 플레이리스트)의 included에 포함된 트랙 속성을 캐시에 반영"""
+    artist_names = _artist_names(resources)
+    with _tidal_metadata_lock:
+        cache = _load_tidal_metadata_cache()
+        for item in resources:
+            if item.get("type") == "tracks" and item.get("id") and item.get("attributes"):
+                metadata = _track_metadata_from_resource(item, artist_names)
+                if metadata["artists"] is None:
+                    # 아티스트가 포함되지 않은 응답이면 이전에 받은 이름을 유지
+                    metadata["artists"] = cache.get(str(item["id"]), {}).get("artists")
+                cache[str(item["id"])] = metadata
+
+def save_tidal_metadata_cache():
+    """트랙 속성 캐시를 저장 (실행마다 한 번). 유효 기간이 지난 항목은 버려 캐시가 계속 커지지 않도록 함"""
+    if _tidal_metadata_cache is None:
+        return
+    now = time.time()
+    with _tidal_metadata_lock:
+        cache = {track_id: entry for track_id, entry in _tidal_metadata_cache.items()
+                 if now - entry.get("fetched", 0) <= TIDAL_METADATA_MAX_AGE}
+        _tidal_metadata_cache.clear()
+        _tidal_metadata_cache.update(cache)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _write_json_atomic(TIDAL_METADATA_FILE, cache)
+    except Exception:
+        pass  # 캐시 저장 실패는 무시
+
+def fetch_tidal_track_metadata(track_ids, headers, logger, limiter=None, stop_flag=None, need_artists=False):
+    """
+    TIDAL 트랙 속성(재생 시간, ISRC, 이용 가능 여부, 음질 태그)을 일괄 조회합니다.
+
+    캐시에 없는(need_artists면 아티스트 이름이 없는 것도) ID만 /v2/tracks?filter[id]=...&include=artists 로
+    최대 TIDAL_METADATA_BATCH개씩 묶어 병렬로 요청하므로, 트랙마다 요청하는 것보다 요청 수가 크게 줄어듭니다.
+    결과는 메모리 캐시에만 반영하며 파일 저장은 실행이 끝날 때 save_tidal_metadata_cache()로 합니다.
+    해당 국가에서 제공되지 않아 응답에 없는 ID는 unavailable로 기록합니다.
+
+    Args:
+        track_ids (iterable): TIDAL 트랙 ID 목록
+        headers (dict): API 요청 헤더
+        logger (callable): 로깅 함수
+        limiter (AdaptiveLimiter): 요청 속도를 조절할 리미터
+        stop_flag (callable): 중단 요청 여부를 반환하는 함수 (요청 제한 대기 중에도 확인)
+        need_artists (bool): 아티스트 이름이 필요한 경우 (검색 후보 점수 계산)
+
+    Returns:
+        dict: 트랙 ID → 속성 딕셔너리
+    """
+    ids = list(dict.fromkeys(str(i) for i in track_ids))
+    now = time.time()
+    with _tidal_metadata_lock:
+        cache = _load_tidal_metadata_cache()
+        missing = [i for i in ids if now - cache.get(i, {}).get("fetched", 0) > TIDAL_METADATA_MAX_AGE
+                   or (need_artists and not (cache[i].get("unavailable") or cache[i].get("artists")))]
+    if missing:
+        limiter = limiter or AdaptiveLimiter("metadata")
+        request_headers = dict(headers, accept="application/vnd.api+json")
+        batches = [missing[i:i + TIDAL_METADATA_BATCH] for i in range(0, len(missing), TIDAL_METADATA_BATCH)]
+        logger(f"[+] TIDAL 트랙 정보 {len(missing)}개 일괄 조회 ({len(batches)}회 요청)")
+
+        def fetch_batch(batch):
+            params = ([("countryCode", "US"), ("include", "artists")]
+                      + [("filter[id]", track_id) for track_id in batch])
+            for _ in range(4):
+                if not limiter.acquire(stop_flag):
+                    return {}
+                started = time.time()
+                try:
+                    response = requests.get("https://openapi.tidal.com/v2/tracks",
+                                            params=params, headers=request_headers, timeout=10)
+                except Exception as e:
+                    logger(f"⚠️ 트랙 정보 조회 중 예외 발생: {e}")
+                    return {}
+                finally:
+                    limiter.release()
+                if response.status_code == 429:
+                    limiter.record_throttle(_retry_after_seconds(response), started)
+                    continue
+                if response.status_code != 200:
+                    logger(f"⚠️ 트랙 정보 조회 실패: {response.status_code} - {response.text}")
+                    return {}
+                limiter.record_success(time.time() - started)
+                data = response.json()
+                artist_names = _artist_names(data.get("included", []))
+                found = {str(item["id"]): _track_metadata_from_resource(item, artist_names)
+                         for item in data.get("data", []) if item.get("id")}
+                for track_id in batch:
+                    found.setdefault(track_id, {"unavailable": True, "fetched": time.time()})
+                return found
+            return {}
+
+        with ThreadPoolExecutor(max_workers=limiter.max_limit) as executor:
+            for found in executor.map(fetch_batch, batches):
+                with _tidal_metadata_lock:
+                    cache.update(found)
+
+    with _tidal_metadata_lock:
+        return {i: cache[i] for i in ids if i in cache}
+
+def _artist_similarity(artist, candidate_artists):
+    """YouTube 아티스트 문자열과 TIDAL 아티스트 목록의 유사도 (참여 아티스트 이름이 포함되면 1)"""
+    artist = normalize(artist)
+    names = [normalize(name) for name in candidate_artists]
+    if any(name and re.search(rf'(?:^| ){re.escape(name)}(?: |$)', artist) for name in names):
+        return 1.0
+    return similar(artist, " ".join(names))
+
+def _score_tidal_candidate(metadata, title, artist=None, duration=None):
+    """
+    검색 후보의 점수 (제목 유사도 + 아티스트 유사도 + 재생 시간 일치 + 무손실 제공 여부).
+    제공되지 않는 곡은 -1
+    """
+    if not metadata or metadata.get("unavailable"):
+        return -1.0
+    candidate_title = " ".join(filter(None, [metadata.get("title"), metadata.get("version")]))
+    score = similar(normalize(title), normalize(candidate_title))
+    if artist and metadata.get("artists"):
+        score += _artist_similarity(artist, metadata["artists"])
+    if duration and metadata.get("duration"):
+        difference = max(0.0, abs(duration - metadata["duration"]) - TIDAL_DURATION_TOLERANCE)
+        score += max(0.0, 1 - difference / 30)
+    if {"LOSSLESS", "HIRES_LOSSLESS"} & set(metadata.get("media_tags", [])):
+        score += 0.1
+    return score
+
+def _is_clear_match(metadata, title, duration=None):
+    """검색 결과의 속성만으로 첫 번째 결과가 확실히 맞는지 (제목이 거의 같고 재생 시간이 허용 범위 안)"""
+    if not metadata or metadata.get("unavailable"):
+        return False
+    candidate_title = " ".join(filter(None, [metadata.get("title"), metadata.get("version")]))
+    if similar(normalize(title), normalize(candidate_title)) < 0.9:
+        return False
+    return not (duration and metadata.get("duration")) or \
+        abs(duration - metadata["duration"]) <= TIDAL_DURATION_TOLERANCE
+
+def search_tidal_track(title, artist, headers, logger, limiter=None, duration=None, result=None, stop_flag=None):
+    """
+    TIDAL에서 트랙을 검색하여 URL을 반환합니다 (찾지 못하면 None).
+
+    상위 후보들의 속성을 한 번에 조회해 제목/아티스트 유사도, 재생 시간(duration, 초), 무손실 제공 여부로
+    점수를 매깁니다. TIDAL의 순위를 존중하여 다른 후보가 첫 번째 결과보다 TIDAL_CANDIDATE_MARGIN 이상
+    높을 때만 바꾸며, 속성을 얻지 못하면 첫 번째 결과를 사용합니다.
+    검색 응답에 포함된 속성만으로 첫 번째 결과가 확실하면 추가 조회 없이 바로 사용하므로,
+    아티스트 조회 요청은 애매한 검색에서만 발생합니다.
+    result 딕셔너리가 주어지면 실패 시 result["reason"]에 not_found / unavailable /
+    rate_limited / error 중 하나를 기록합니다. stop_flag가 주어지면 요청 제한 대기 중에도 중단합니다.
+    """
+    if result is None:
+        result = {}
+    result["reason"] = "error"
     query = f"{title} {artist}"
-    norm_query = normalize(query)
+    norm_query = normalize(query) or _fold(query).strip()
+    limiter = limiter or AdaptiveLimiter("search")
     
-    # 요청 재시도 로직 추가
-    max_retries = 3
-    retry_delay = 2  # 초
+    # 요청 재시도 로직 - 대기 시간은 리미터가 429 응답을 반영하여 결정
+    max_retries = 4
     
     for attempt in range(max_retries):
+        if not limiter.acquire(stop_flag):
+            return None
+        started = time.time()
         try:
-            url = f"https://openapi.tidal.com/v2/searchresults/{norm_query}?countryCode=US&include=tracks"
+            url = (f"https://openapi.tidal.com/v2/searchresults/{urllib.parse.quote(norm_query, safe='')}"
+                   f"?countryCode=US&include=tracks")
             if attempt == 0:
                 logger(f"[+] 검색 쿼리: {norm_query}")
             else:
@@ -182,20 +931,22 @@ def search_tidal_track(title, artist, headers, logger):
             response = requests.get(url, headers=headers, timeout=10)  # 10초 타임아웃
             
             if response.status_code == 200:
+                limiter.record_success(time.time() - started)
                 data = response.json()
                 tracks = data.get("data", {}).get("relationships", {}).get("tracks", {}).get("data", [])
                 if tracks:
-                    track = tracks[0]
-                    logger(f"[+] TIDAL 검색 성공: {track['id']}")
-                    return f"https://tidal.com/browse/track/{track['id']}"
+                    store_tidal_track_metadata(data.get("included", []))
+                    candidates = [str(t['id']) for t in tracks[:TIDAL_SEARCH_CANDIDATES]]
+                    break
                 else:
                     logger(f"⚠️ 검색 결과 없음: {norm_query}")
+                    result["reason"] = "not_found"
                     return None
             elif response.status_code == 429:  # Too Many Requests
+                limiter.record_throttle(_retry_after_seconds(response), started)
+                result["reason"] = "rate_limited"
                 if attempt < max_retries - 1:
-                    wait_time = retry_delay * (attempt + 1)
-                    logger(f"⚠️ 요청 제한 발생. {wait_time}초 후 재시도...")
-                    time.sleep(wait_time)
+                    logger(f"⚠️ 요청 제한 발생. {limiter.backoff_remaining():.1f}초 후 재시도...")
                     continue
             else:
                 logger(f"❌ 검색 실패: {response.status_code} - {response.text}")
@@ -204,13 +955,33 @@ def search_tidal_track(title, artist, headers, logger):
         except requests.exceptions.Timeout:
             logger("⚠️ 검색 타임아웃")
             if attempt < max_retries - 1:
-                time.sleep(retry_delay)
                 continue
         except Exception as e:
             logger(f"⚠️ 검색 중 예외 발생: {e}")
             return None
-            
-    return None
+        finally:
+            limiter.release()
+    else:
+        return None
+    
+    # 후보 점수 비교는 검색 슬롯을 반납한 뒤 수행 (속성 조회도 같은 리미터를 사용)
+    track_id = candidates[0]
+    with _tidal_metadata_lock:
+        top_metadata = _load_tidal_metadata_cache().get(track_id)
+    if len(candidates) > 1 and not _is_clear_match(top_metadata, title, duration):
+        metadata = fetch_tidal_track_metadata(candidates, headers, logger, limiter, stop_flag, need_artists=True)
+        scores = {c: _score_tidal_candidate(metadata.get(c), title, artist, duration) for c in candidates}
+        best = max(candidates, key=lambda c: scores[c])
+        if all(c in metadata for c in candidates) and scores[best] < 0:
+            logger(f"⚠️ 검색된 트랙을 모두 이용할 수 없습니다: {norm_query}")
+            result["reason"] = "unavailable"
+            return None
+        if scores[best] >= scores[track_id] + TIDAL_CANDIDATE_MARGIN:
+            logger(f"[+] 후보 {len(candidates)}개 중 더 일치하는 트랙 선택 (점수 {scores[best]:.2f})")
+            track_id = best
+    result["reason"] = None
+    logger(f"[+] TIDAL 검색 성공: {track_id}")
+    return f"https://tidal.com/browse/track/{track_id}"
 
 def find_executable_path(command):
     """명령어의 전체 경로 찾기"""
@@ -267,59 +1038,379 @@ def find_executable_path(command):
     # 찾지 못했을 경우 원래 명령어 반환
     return command
 
-def update_tidal_dl_config(tidal_dl, track_dir, logger):
-    logger("[+] tidal-dl-ng 설정 파일 경로 확인 중...")
-    
+def find_tidal_dl_config_path(tidal_dl, logger):
+    """
+    tidal-dl-ng settings.json 경로를 반환합니다 (실패 시 None).
+
+    `tidal-dl-ng cfg` 실행 결과를 실행 파일 경로/수정 시간별로 캐시하여, 실행 파일이 바뀌거나
+    설정 파일이 없어지기 전까지는 매 실행마다 하위 프로세스를 띄우지 않습니다.
+    """
     # 실행 파일 경로 찾기
     tidal_dl_path = find_executable_path(tidal_dl)
     logger(f"[+] tidal-dl-ng 경로: {tidal_dl_path}")
+    try:
+        exe_mtime = os.path.getmtime(tidal_dl_path)
+    except OSError:
+        exe_mtime = None
+    try:
+        with open(TIDAL_DL_CONFIG_CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except Exception:
+        cache = {}
+    cached = cache.get(tidal_dl_path) or {}
+    if cached.get("mtime") == exe_mtime and cached.get("config_path") and os.path.exists(cached["config_path"]):
+        return cached["config_path"]
+
+    # Windows에서만 CREATE_NO_WINDOW 사용
+    creation_flags = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
+    extra_kwargs = {"creationflags": creation_flags} if os.name == "nt" else {}
     
+    # 환경 변수 설정 - PATH 포함
+    env = os.environ.copy()
+    
+    result = subprocess.run([tidal_dl_path, "cfg"], 
+                           capture_output=True, 
+                           text=True, 
+                           env=env,
+                           **extra_kwargs)
+                           
+    match = re.search(r'Config:\s+(.*settings\.json)', result.stdout)
+    if not match:
+        logger("❌ settings.json 경로를 찾을 수 없습니다.")
+        logger(f"출력: {result.stdout}")
+        if result.stderr:
+            logger(f"오류: {result.stderr}")
+        return None
+
+    config_path = match.group(1)
+    cache[tidal_dl_path] = {"mtime": exe_mtime, "config_path": config_path}
     try:
-        # Windows에서만 CREATE_NO_WINDOW 사용
-        creation_flags = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
-        extra_kwargs = {"creationflags": creation_flags} if os.name == "nt" else {}
-        
-        # 환경 변수 설정 - PATH 포함
-        env = os.environ.copy()
-        
-        result = subprocess.run([tidal_dl_path, "cfg"], 
-                               capture_output=True, 
-                               text=True, 
-                               env=env,
-                               **extra_kwargs)
-                               
-        match = re.search(r'Config:\s+(.*settings\.json)', result.stdout)
-        if match:
-            config_path = match.group(1)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _write_json_atomic(TIDAL_DL_CONFIG_CACHE_FILE, cache)
+    except OSError:
+        pass  # 캐시 저장 실패는 무시
+    return config_path
+
+def update_tidal_dl_config(tidal_dl, track_dir, logger):
+    """tidal-dl-ng 설정을 갱신하고 settings.json 경로를 반환합니다 (실패 시 None)."""
+    logger("[+] tidal-dl-ng 설정 파일 경로 확인 중...")
+    
+    try:
+        config_path = find_tidal_dl_config_path(tidal_dl, logger)
+        if config_path:
             logger(f"[+] 설정 파일 경로: {config_path}")
 
             with open(config_path, "r", encoding="utf-8") as f:
                 config = json.load(f)
 
-            config["download_base_path"] = track_dir
-            config["quality_audio"] = "LOSSLESS"
-
-            with open(config_path, "w", encoding="utf-8") as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
-
-            logger("[+] tidal-dl-ng 설정 업데이트 완료")
-        else:
-            logger("❌ settings.json 경로를 찾을 수 없습니다.")
-            logger(f"출력: {result.stdout}")
-            if result.stderr:
-                logger(f"오류: {result.stderr}")
+            # 값이 같으면 다시 쓰지 않음 (동시에 실행 중인 다른 작업자와 충돌 방지)
+            if config.get("download_base_path") != track_dir or config.get("quality_audio") != "LOSSLESS":
+                config["download_base_path"] = track_dir
+                config["quality_audio"] = "LOSSLESS"
+                _write_json_atomic(config_path, config)
+                logger("[+] tidal-dl-ng 설정 업데이트 완료")
+            else:
+                logger("[+] tidal-dl-ng 설정이 이미 최신입니다")
+            return config_path
     except Exception as e:
         logger(f"❌ 설정 업데이트 중 예외 발생: {e}")
+    return None
 
-def download_with_tidal_dl(tidal_dl, track_url, logger, stop_flag=None):
-    logger(f"⬇️ 다운로드 시도 중: {track_url}")
-    
-    # 중단 요청 확인
-    if stop_flag and stop_flag():
-        logger("⚠️ 사용자 요청으로 다운로드가 중단되었습니다.")
+# tidal-dl-ng 진행률 출력 파싱 (예: "45% ━━━━ 12.3/27.1 MB", "1.2 MB / 30.5 MB")
+PROGRESS_SIZE_RE = re.compile(
+    r'(?P<done>\d+(?:\.\d+)?)\s*(?P<done_unit>[kKMGT]i?B|B)?\s*/\s*'
+    r'(?P<total>\d+(?:\.\d+)?)\s*(?P<total_unit>[kKMGT]i?B|B)\b'
+)
+PROGRESS_PERCENT_RE = re.compile(r'(?P<percent>\d{1,3}(?:\.\d+)?)\s*%')
+# 퍼센트만 있는 줄은 진행 막대가 함께 있거나 퍼센트만 출력된 경우에만 진행률로 취급
+# ("Downloading 100% Pure Love ..." 같은 곡 제목을 진행률로 오인하지 않도록)
+PROGRESS_BAR_RE = re.compile(r'[━─█▇▆▅▄▃▂▁▏▎▍▌▋▊▉#=]{3,}')
+PROGRESS_PERCENT_ONLY_RE = re.compile(r'^\s*\d{1,3}(?:\.\d+)?\s*%\s*$')
+SIZE_UNITS = {
+    "B": 1,
+    "KB": 1000, "MB": 1000 ** 2, "GB": 1000 ** 3, "TB": 1000 ** 4,
+    "KIB": 1024, "MIB": 1024 ** 2, "GIB": 1024 ** 3, "TIB": 1024 ** 4,
+}
+OUTPUT_POLL_INTERVAL = 0.2  # 출력이 없을 때 중단 요청을 확인하는 주기 (초)
+PROGRESS_LOG_STEP = 10  # 진행률 로그 출력 간격 (%)
+RATE_LIMIT_RE = re.compile(r'\b429\b|too many requests|rate.?limit', re.IGNORECASE)
+UNAVAILABLE_RE = re.compile(r'not (?:available|streamable)|unavailable', re.IGNORECASE)
+
+def parse_tidal_dl_progress(line):
+    """
+    tidal-dl-ng 출력 한 줄에서 진행률 정보를 추출합니다.
+
+    Args:
+        line (str): tidal-dl-ng 출력 한 줄
+
+    Returns:
+        dict | None: downloaded_bytes, total_bytes, percent 키를 가진 딕셔너리.
+                     진행률 정보가 없는 줄이면 None
+    """
+    size_match = PROGRESS_SIZE_RE.search(line)
+    percent_match = None
+    if size_match or PROGRESS_BAR_RE.search(line) or PROGRESS_PERCENT_ONLY_RE.match(line):
+        percent_match = PROGRESS_PERCENT_RE.search(line)
+    if not size_match and not percent_match:
+        return None
+
+    progress = {"downloaded_bytes": None, "total_bytes": None, "percent": None}
+    if size_match:
+        total_unit = size_match.group("total_unit").upper()
+        done_unit = (size_match.group("done_unit") or total_unit).upper()
+        progress["downloaded_bytes"] = int(float(size_match.group("done")) * SIZE_UNITS[done_unit])
+        progress["total_bytes"] = int(float(size_match.group("total")) * SIZE_UNITS[total_unit])
+    if percent_match:
+        progress["percent"] = min(float(percent_match.group("percent")), 100.0)
+    elif progress["total_bytes"]:
+        progress["percent"] = min(progress["downloaded_bytes"] * 100.0 / progress["total_bytes"], 100.0)
+    return progress
+
+def _split_output_lines(buffer, chunk):
+    """바이트 버퍼에 chunk를 이어 붙이고 완성된 줄(\\r 또는 \\n 기준)과 남은 버퍼를 반환"""
+    buffer += chunk
+    lines = re.split(rb'[\r\n]', buffer)
+    return lines[:-1], lines[-1]
+
+def _iter_process_output(process, poll_interval=OUTPUT_POLL_INTERVAL):
+    """
+    자식 프로세스의 stdout/stderr를 동시에 읽어 (스트림 이름, 줄) 을 순서대로 반환합니다.
+
+    한쪽 파이프만 읽다가 다른 쪽 버퍼가 가득 차 자식 프로세스가 멈추는 일이 없도록
+    두 스트림을 함께 다중화합니다. POSIX에서는 selectors를, 파이프에 select를 쓸 수 없는
+    Windows에서는 스트림별 리더 스레드를 사용합니다.
+    poll_interval 동안 출력이 없으면 (None, None)을 반환하므로 호출하는 쪽에서
+    즉시 중단 요청을 확인할 수 있습니다.
+    """
+    streams = {"stdout": process.stdout, "stderr": process.stderr}
+    buffers = {name: b"" for name in streams}
+
+    if os.name == "nt":
+        events = queue.Queue()
+
+        def reader(name, stream):
+            try:
+                while True:
+                    chunk = os.read(stream.fileno(), 65536)
+                    events.put((name, chunk))
+                    if not chunk:
+                        break
+            except OSError:
+                events.put((name, b""))
+
+        for name, stream in streams.items():
+            threading.Thread(target=reader, args=(name, stream), daemon=True).start()
+
+        open_streams = set(streams)
+        while open_streams:
+            try:
+                name, chunk = events.get(timeout=poll_interval)
+            except queue.Empty:
+                yield None, None
+                continue
+            if not chunk:
+                open_streams.discard(name)
+                continue
+            lines, buffers[name] = _split_output_lines(buffers[name], chunk)
+            for line in lines:
+                yield name, line.decode("utf-8", errors="replace")
+    else:
+        with selectors.DefaultSelector() as selector:
+            for name, stream in streams.items():
+                selector.register(stream, selectors.EVENT_READ, name)
+
+            while selector.get_map():
+                ready = selector.select(timeout=poll_interval)
+                if not ready:
+                    yield None, None
+                    continue
+                for key, _ in ready:
+                    name = key.data
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        selector.unregister(key.fileobj)
+                        continue
+                    lines, buffers[name] = _split_output_lines(buffers[name], chunk)
+                    for line in lines:
+                        yield name, line.decode("utf-8", errors="replace")
+
+    # 줄바꿈 없이 끝난 마지막 출력
+    for name, rest in buffers.items():
+        if rest:
+            yield name, rest.decode("utf-8", errors="replace")
+
+def _terminate_process(process, timeout=5):
+    """자식 프로세스를 종료하고, 응답이 없으면 강제 종료"""
+    if process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+def _pid_alive(pid):
+    """같은 호스트의 프로세스가 살아 있는지 확인 (Windows에서는 판단하지 않음)"""
+    if os.name == "nt":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
         return False
-    
-    # 실행 파일 경로 찾기
+    except PermissionError:
+        return True
+    return True
+
+def cleanup_stale_staging(track_dir, logger):
+    """
+    이전 실행에서 남겨진 스테이징 디렉토리를 정리합니다.
+
+    소유 프로세스가 같은 호스트에서 이미 종료되었거나, 소유자를 확인할 수 없는 상태로
+    STAGING_MAX_AGE 이상 지난 디렉토리만 삭제하므로 실행 중인 다른 작업은 건드리지 않습니다.
+    """
+    staging_root = os.path.join(track_dir, STAGING_DIR_NAME)
+    if not os.path.isdir(staging_root):
+        return
+
+    removed = 0
+    for entry in os.scandir(staging_root):
+        if not entry.is_dir():
+            continue
+        try:
+            owner = {}
+            owner_file = os.path.join(entry.path, "owner.json")
+            if os.path.exists(owner_file):
+                with open(owner_file, "r", encoding="utf-8") as f:
+                    owner = json.load(f)
+            age = time.time() - entry.stat().st_mtime
+            same_host = owner.get("host") == socket.gethostname()
+            abandoned = same_host and owner.get("pid") and not _pid_alive(owner["pid"])
+            if abandoned or age > STAGING_MAX_AGE:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+        except Exception as e:
+            logger(f"⚠️ 스테이징 디렉토리 정리 실패: {entry.name} - {e}")
+
+    if removed:
+        logger(f"[+] 중단된 이전 다운로드 스테이징 디렉토리 {removed}개 정리")
+
+def _create_staging_job(track_dir, config_path):
+    """
+    다운로드 작업 하나를 위한 스테이징 디렉토리를 만듭니다.
+
+    tidal-dl-ng는 설정 파일의 download_base_path에만 저장하므로, 작업마다 설정 디렉토리를
+    복사해 download_base_path를 스테이징 디렉토리로 바꾸고 XDG_CONFIG_HOME으로 지정합니다.
+    공유 settings.json을 작업마다 다시 쓰지 않으므로 동시 실행에도 안전합니다.
+
+    Returns:
+        dict: path, download_path, env 키를 가진 작업 정보
+    """
+    job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    job_path = os.path.join(track_dir, STAGING_DIR_NAME, job_id)
+    download_path = os.path.join(job_path, "download")
+    os.makedirs(download_path, exist_ok=True)
+    _write_json_atomic(os.path.join(job_path, "owner.json"), {
+        "host": socket.gethostname(),
+        "pid": os.getpid(),
+        "created": time.time(),
+    })
+
+    # 토큰 등 기존 설정 디렉토리 내용을 그대로 복사
+    source_config_dir = os.path.dirname(config_path)
+    job_config_dir = os.path.join(job_path, "config", os.path.basename(source_config_dir))
+    shutil.copytree(source_config_dir, job_config_dir,
+                    ignore=shutil.ignore_patterns("*.log", "*.tmp"))
+
+    job_settings = os.path.join(job_config_dir, os.path.basename(config_path))
+    with open(job_settings, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config["download_base_path"] = download_path
+    _write_json_atomic(job_settings, config)
+
+    env = os.environ.copy()
+    env["XDG_CONFIG_HOME"] = os.path.join(job_path, "config")
+    return {"path": job_path, "download_path": download_path, "env": env}
+
+def _discard_staging_job(job):
+    """스테이징 디렉토리와 그 안의 불완전한 파일을 삭제"""
+    shutil.rmtree(job["path"], ignore_errors=True)
+
+def _finalize_staging_job(job, track_dir, logger):
+    """
+    스테이징 디렉토리에 받은 파일을 검증한 뒤 Tracks 폴더로 원자적으로 이동합니다.
+
+    작업마다 빈 스테이징 디렉토리에 받으므로 tidal-dl-ng 자체의 "이미 있는 파일 건너뛰기"가
+    동작하지 않습니다. 그래서 Tracks 폴더에 같은 이름의 정상 파일이 이미 있으면 덮어쓰지 않고
+    기존 파일을 그대로 두며, 손상된 기존 파일만 새 파일로 교체합니다.
+
+    Returns:
+        list | None: 라이브러리에 들어간(또는 이미 있던) 파일 경로 목록.
+                     받은 파일이 없거나 검증에 실패한 파일이 있으면 None
+    """
+    staged_files = []
+    for root, _, files in os.walk(job["download_path"]):
+        for filename in files:
+            if filename.lower().endswith(AUDIO_EXTENSIONS):
+                staged_files.append(os.path.join(root, filename))
+
+    if not staged_files:
+        # tidal-dl-ng는 실패해도 종료 코드 0을 반환하는 경우가 있음
+        logger("⚠️ 스테이징 디렉토리에 다운로드된 파일이 없습니다.")
+        return None
+
+    # 하나라도 손상되었으면 라이브러리에 아무것도 넣지 않음
+    for file_path in staged_files:
+        if not verify_audio_file(file_path, logger):
+            return None
+
+    tracks_path = os.path.join(track_dir, "Tracks")
+    os.makedirs(tracks_path, exist_ok=True)
+    moved = []
+    for file_path in staged_files:
+        target = os.path.join(tracks_path, os.path.basename(file_path))
+        if os.path.exists(target) and verify_audio_file(target, logger):
+            logger(f"[+] 이미 라이브러리에 있는 파일이므로 유지: {os.path.basename(target)}")
+        else:
+            os.replace(file_path, target)  # 같은 파일 시스템이므로 원자적 rename
+            logger(f"[+] 라이브러리로 이동: {os.path.basename(target)}")
+        moved.append(target)
+    return moved
+
+def download_with_tidal_dl(tidal_dl, track_url, logger, stop_flag=None, progress_callback=None,
+                           track_dir=None, config_path=None, result=None):
+    """
+    tidal-dl-ng로 트랙 하나를 다운로드합니다.
+
+    호출마다 자체 프로세스와 출력 다중화 상태를 가지므로 여러 스레드에서 동시에 호출해도 안전합니다.
+    track_dir와 config_path가 주어지면 작업별 스테이징 디렉토리에 받은 뒤 검증을 통과한
+    파일만 Tracks 폴더로 옮기고, 중단되거나 실패한 작업의 파일은 스테이징 디렉토리째 삭제합니다.
+
+    Args:
+        tidal_dl (str): tidal-dl-ng 실행 명령어 또는 경로
+        track_url (str): TIDAL 트랙 URL
+        logger (callable): 로깅 함수
+        stop_flag (callable): 중단 요청 여부를 반환하는 함수
+        progress_callback (callable): 진행률 딕셔너리(track_url 포함)를 받는 함수
+        track_dir (str): 트랙 디렉토리 경로
+        config_path (str): update_tidal_dl_config가 반환한 tidal-dl-ng settings.json 경로
+        result (dict): 전달되면 files(이동된 파일 목록), bytes(받은 바이트 수),
+                       rate_limited(요청 제한 감지 여부), unavailable(제공되지 않는 곡 여부)을 기록
+
+    Returns:
+        bool: 다운로드 성공 여부
+    """
+    if result is None:
+        result = {}
+    result.update({"files": [], "bytes": 0, "rate_limited": False, "unavailable": False})
+    logger(f"⬇️ 다운로드 시도 중: {track_url}")
+    
+    # 중단 요청 확인
+    if stop_flag and stop_flag():
+        logger("⚠️ 사용자 요청으로 다운로드가 중단되었습니다.")
+        return False
+    
+    # 실행 파일 경로 찾기
     tidal_dl_path = find_executable_path(tidal_dl)
     
     # 파일 존재 확인 및 오류 표시
@@ -336,69 +1427,93 @@ def download_with_tidal_dl(tidal_dl, track_url, logger, stop_flag=None):
             logger(f"⚠️ 실행 권한 추가 실패: {e}")
             return False
     
+    job = None
     try:
         # Windows에서만 CREATE_NO_WINDOW 사용
         creation_flags = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
         extra_kwargs = {"creationflags": creation_flags} if os.name == "nt" else {}
         
         # 환경 변수 설정 - PATH 포함
-        env = os.environ.copy()
+        if track_dir and config_path:
+            job = _create_staging_job(track_dir, config_path)
+            env = job["env"]
+        else:
+            env = os.environ.copy()
         
         logger(f"[+] 실행 명령: {tidal_dl_path} dl {track_url}")
         
+        # 진행률 출력(\r)까지 줄 단위로 처리하기 위해 바이너리 파이프를 직접 읽음
         process = subprocess.Popen(
             [tidal_dl_path, "dl", track_url],
-            text=True,
+            stdin=subprocess.DEVNULL,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
+            bufsize=0,
             env=env,
             **extra_kwargs
         )
         
-        # 실시간으로 출력 모니터링하면서 중단 요청 확인
-        while True:
-            # 중단 요청 확인
-            if stop_flag and stop_flag():
-                process.terminate()
-                process.wait(timeout=5)  # 5초 대기
+        last_logged_percent = -PROGRESS_LOG_STEP
+        finished = False
+        try:
+            # stdout/stderr를 함께 모니터링하면서 중단 요청 확인
+            for stream_name, line in _iter_process_output(process):
+                if stop_flag and stop_flag():
+                    _terminate_process(process)
+                    if job:
+                        logger("[+] 중단된 다운로드 파일 삭제")
+                    logger("⚠️ 다운로드가 중단되었습니다.")
+                    return False
                 
-                # 다운로드 중이던 파일 삭제
-                try:
-                    tracks_path = os.path.join(os.path.dirname(track_url), "Tracks")
-                    if os.path.exists(tracks_path):
-                        for file in os.listdir(tracks_path):
-                            if os.path.getctime(os.path.join(tracks_path, file)) > time.time() - 60:  # 1분 이내 생성된 파일
-                                try:
-                                    os.remove(os.path.join(tracks_path, file))
-                                    logger(f"[+] 중단된 다운로드 파일 삭제: {file}")
-                                except Exception as e:
-                                    logger(f"⚠️ 파일 삭제 실패: {file} - {e}")
-                except Exception as e:
-                    logger(f"⚠️ 중단된 파일 정리 중 오류: {e}")
+                if line is None:
+                    continue
+                line = line.strip()
+                if not line:
+                    continue
                 
-                logger("⚠️ 다운로드가 중단되었습니다.")
-                return False
-            
-            # 프로세스 출력 읽기
-            output = process.stdout.readline()
-            if output == '' and process.poll() is not None:
-                break
-            if output:
-                logger(output.strip())
-        
-        # 에러 출력 확인
-        stderr = process.stderr.read()
-        if stderr:
-            logger(f"오류: {stderr}")
+                progress = parse_tidal_dl_progress(line)
+                if progress is None:
+                    if RATE_LIMIT_RE.search(line):
+                        result["rate_limited"] = True
+                    elif UNAVAILABLE_RE.search(line):
+                        result["unavailable"] = True
+                    logger(f"오류: {line}" if stream_name == "stderr" else line)
+                    continue
+                
+                progress["track_url"] = track_url
+                result["bytes"] = progress["total_bytes"] or result["bytes"]
+                if progress_callback:
+                    progress_callback(progress)
+                # 진행률 줄은 일정 간격으로만 로그에 남김
+                percent = progress["percent"] or 0.0
+                if percent >= last_logged_percent + PROGRESS_LOG_STEP or percent >= 100.0 > last_logged_percent:
+                    last_logged_percent = percent
+                    if progress["total_bytes"]:
+                        logger(f"[+] 진행률 {percent:.0f}% "
+                               f"({progress['downloaded_bytes'] / 1e6:.1f}/{progress['total_bytes'] / 1e6:.1f} MB)")
+                    else:
+                        logger(f"[+] 진행률 {percent:.0f}%")
+            finished = True
+        finally:
+            # 예외로 빠져나가는 경우에도 자식 프로세스를 남기지 않음
+            if not finished:
+                _terminate_process(process)
             
-        return_code = process.poll()
+        return_code = process.wait()
         if return_code != 0:
             logger(f"⚠️ 프로세스 종료 코드: {return_code}")
+            return False
+        
+        if job:
+            moved = _finalize_staging_job(job, track_dir, logger)
+            if moved is None:
+                logger(f"❌ 다운로드된 파일이 없거나 검증에 실패했습니다: {track_url}")
+                return False
+            result["files"] = moved
+            result["bytes"] = sum(os.path.getsize(f) for f in moved) or result["bytes"]
             
-        return return_code == 0
+        return True
             
-    except subprocess.TimeoutExpired:
-        logger("⏱ 타임아웃 발생")
     except FileNotFoundError:
         logger(f"❌ 오류: 파일을 찾을 수 없습니다: {tidal_dl_path}")
         logger("tidal-dl-ng가 올바르게 설치되었는지 확인하세요.")
@@ -409,25 +1524,809 @@ def download_with_tidal_dl(tidal_dl, track_url, logger, stop_flag=None):
         logger(f"⚠️ 다운로드 중 예외 발생: {e}")
         import traceback
         logger(traceback.format_exc())
+    finally:
+        # 성공 시에는 이미 옮겨진 뒤이므로 남은 것은 불완전한 파일뿐
+        if job:
+            _discard_staging_job(job)
     return False
 
-def try_download(tracks, tidal_dl, headers, track_dir, logger, stop_flag=None):
-    failed = []
-    for idx, t in enumerate(tracks, start=1):
-        # 중단 요청 확인
-        if stop_flag and stop_flag():
-            logger("⚠️ 사용자 요청으로 다운로드가 중단되었습니다.")
-            return failed
-            
+class DownloadScheduler:
+    """
+    실행 간 유지되는 다운로드 우선순위/재시도 일정.
+
+    트랙마다 시도 횟수와 마지막 실패 유형을 기록하여
+    - 일시적 실패(요청 제한, 다운로드 오류)는 실행을 넘나드는 지수 백오프 후 다시 시도하고,
+    - TIDAL에 없는 곡(검색 결과 없음, 이용 불가)은 SCHEDULE_PARK_DURATION 동안 보류합니다.
+    다운로드 순서는 우선 재생목록(pin) → 처음 시도하는 곡 → 짧은 곡 순입니다.
+    한 재생목록 안에서는 모든 곡의 pin 여부가 같으므로, pin은 다른 재생목록과의 순서에 작용합니다:
+    다른 재생목록을 동기화할 때 우선 재생목록에도 속한 곡을 먼저 받고, 공유 작업 큐에서는
+    우선 재생목록의 작업이 다른 재생목록 작업보다 먼저 임대됩니다 (priority_band).
+    """
+
+    def __init__(self, path=SCHEDULE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            data = {}
+        self.pinned = set(data.get("pinned", []))
+        self.tracks = data.get("tracks", {})
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with self._lock:
+                data = {"pinned": sorted(self.pinned), "tracks": dict(self.tracks)}
+            _write_json_atomic(self.path, data)
+        except Exception:
+            pass  # 일정 저장 실패는 무시
+
+    def pin(self, playlist_id, pinned=True):
+        with self._lock:
+            if pinned:
+                self.pinned.add(playlist_id)
+            else:
+                self.pinned.discard(playlist_id)
+
+    def entry(self, key):
+        with self._lock:
+            return dict(self.tracks.get(key, {}))
+
+    def is_due(self, key, now=None):
+        """지금 시도해도 되는지 (보류/백오프 중이 아닌지)"""
+        return self.entry(key).get("next_attempt", 0) <= (now or time.time())
+
+    def is_pinned(self, key, playlist_id=None):
+        """트랙이 우선 재생목록(이번 재생목록 또는 이전에 기록된 재생목록)에 속하는지"""
+        with self._lock:
+            playlists = set(self.tracks.get(key, {}).get("playlists", []))
+            return bool((playlists | ({playlist_id} if playlist_id else set())) & self.pinned)
+
+    def priority_band(self, key, playlist_id=None):
+        """공유 작업 큐 우선순위의 기준값 (우선 재생목록 곡은 0, 나머지는 JOB_PRIORITY_BAND)"""
+        return 0 if self.is_pinned(key, playlist_id) else JOB_PRIORITY_BAND
+
+    def order(self, items, key_fn, playlist_id=None, duration_fn=None):
+        """
+        items를 시도 가능한 것과 미룰 것으로 나누고 우선순위대로 정렬합니다.
+
+        Returns:
+            tuple: (정렬된 시도 대상 목록, 보류/백오프 중인 목록)
+        """
+        now = time.time()
+        due, deferred = [], []
+        for item in items:
+            (due if self.is_due(key_fn(item), now) else deferred).append(item)
+
+        def priority(item):
+            key = key_fn(item)
+            entry = self.entry(key)
+            duration = duration_fn(item) if duration_fn else None
+            return (not self.is_pinned(key, playlist_id), entry.get("attempts", 0) > 0,
+                    duration if duration else float("inf"))
+
+        due.sort(key=priority)
+        return due, deferred
+
+    def _update(self, key, playlist_id, **fields):
+        entry = self.tracks.setdefault(key, {"attempts": 0, "failures": 0, "playlists": []})
+        if playlist_id and playlist_id not in entry["playlists"]:
+            entry["playlists"].append(playlist_id)
+        entry["attempts"] += 1
+        entry["updated"] = time.time()
+        entry.update(fields)
+        return entry
+
+    def record_success(self, key, playlist_id=None):
+        with self._lock:
+            self._update(key, playlist_id, status="done", failures=0, reason=None, next_attempt=0)
+
+    def record_failure(self, key, reason, playlist_id=None):
+        """실패 유형(reason)에 따라 다음 시도 시각을 정함"""
+        with self._lock:
+            entry = self._update(key, playlist_id, reason=reason)
+            entry["failures"] = entry.get("failures", 0) + 1
+            if reason in ("not_found", "unavailable"):
+                entry["status"] = "parked"
+                delay = SCHEDULE_PARK_DURATION
+            elif reason == "error" and entry["failures"] == 1:
+                entry["status"] = "pending"
+                delay = 0  # 첫 다운로드 오류는 이번 실행의 재시도에서 바로 다시 시도
+            else:
+                entry["status"] = "pending"
+                base = SCHEDULE_BACKOFF.get(reason, SCHEDULE_BACKOFF["error"])
+                delay = min(SCHEDULE_MAX_BACKOFF, base * 2 ** (entry["failures"] - 1))
+            entry["next_attempt"] = time.time() + delay
+            return delay
+
+class ProvenanceLedger:
+    """
+    라이브러리 파일별 출처 기록 (Tracks/.provenance.json).
+
+    다운로드한 파일마다 TIDAL 트랙 ID와 원본 재생목록 항목을 남겨, 손상된 파일을 다시 검색하지 않고
+    같은 트랙 ID로 바로 다시 받을 수 있게 합니다. 저장 시 파일의 현재 내용과 합치므로
+    같은 라이브러리를 동기화하는 다른 프로세스의 기록을 덮어쓰지 않습니다.
+    작업별 빈 스테이징 디렉토리에서는 tidal-dl-ng의 "이미 있는 파일 건너뛰기"가 동작하지 않으므로,
+    이미 받은 TIDAL 트랙인지도 이 기록으로 확인합니다 (existing_files).
+    """
+
+    def __init__(self, track_dir):
+        self.path = os.path.join(track_dir, "Tracks", PROVENANCE_FILE_NAME)
+        self._lock = threading.Lock()
+        self._by_tidal_id = None  # TIDAL 트랙 ID → 파일명 목록 (필요할 때 생성)
+        self.files = self._read()
+        self._changed = {}
+        self._removed = set()
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get("files", {})
+        except Exception:
+            return {}
+
+    def get(self, filename):
+        with self._lock:
+            entry = self.files.get(filename)
+            return dict(entry) if entry else None
+
+    def existing_files(self, tidal_id):
+        """이 TIDAL 트랙으로 받은 파일 중 Tracks 폴더에 아직 있는 파일 경로 목록"""
+        tracks_path = os.path.dirname(self.path)
+        with self._lock:
+            if self._by_tidal_id is None:
+                self._by_tidal_id = {}
+                for name, entry in self.files.items():
+                    self._by_tidal_id.setdefault(str(entry.get("tidal_id")), []).append(name)
+            names = list(self._by_tidal_id.get(str(tidal_id), []))
+        return [os.path.join(tracks_path, name) for name in names
+                if os.path.exists(os.path.join(tracks_path, name))]
+
+    def record(self, files, track_url, source):
+        """다운로드된 파일 목록을 트랙 URL/원본 항목과 함께 기록"""
+        match = re.search(r'track/(\d+)', track_url or "")
+        entry = {"tidal_id": match.group(1) if match else None, "url": track_url,
+                 "source": source, "downloaded": time.time()}
+        with self._lock:
+            self._by_tidal_id = None
+            for path in files:
+                name = os.path.basename(path)
+                self.files[name] = self._changed[name] = entry
+                self._removed.discard(name)
+
+    def forget(self, filename):
+        with self._lock:
+            self._by_tidal_id = None
+            self.files.pop(filename, None)
+            self._changed.pop(filename, None)
+            self._removed.add(filename)
+
+    def save(self):
+        """이번 실행의 변경분을 디스크의 최신 내용에 합쳐 원자적으로 저장 (없어진 파일 항목은 정리)"""
+        with self._lock:
+            if not (self._changed or self._removed):
+                return
+            files = self._read()
+            files.update(self._changed)
+            for name in self._removed:
+                files.pop(name, None)
+            tracks_path = os.path.dirname(self.path)
+            try:
+                existing = set(os.listdir(tracks_path))
+                files = {name: entry for name, entry in files.items() if name in existing}
+                _write_json_atomic(self.path, {"files": files})
+                os.utime(self.path, None)
+            except OSError:
+                return  # 출처 기록 저장 실패는 무시
+            self.files = files
+            self._by_tidal_id = None
+            self._changed.clear()
+            self._removed.clear()
+
+def _provenance_source(track, playlist_id=None):
+    """출처 기록에 남길 원본 재생목록 항목"""
+    if isinstance(track, TrackRecord):
+        return dict(track.to_dict(), type="ytmusic", playlist_id=playlist_id)
+    if track.get("source"):  # 출처 기록으로 다시 받는 트랙은 원래 출처 유지
+        return track["source"]
+    return {"type": "tidal", "playlist_id": playlist_id, "id": track.get("id"), "title": track.get("title"),
+            "duration": track.get("duration")}
+
+def _is_network_path(path):
+    """
+    경로가 네트워크 공유(NFS/SMB 등)에 있는지 확인합니다 (판단할 수 없으면 False).
+
+    Windows는 UNC 경로와 네트워크 드라이브, Linux는 /proc/mounts의 파일 시스템 종류,
+    macOS는 mount 명령 출력으로 판단합니다.
+    """
+    path = os.path.realpath(path)
+    try:
+        if os.name == "nt":
+            if path.startswith(("\\\\", "//")):
+                return True
+            import ctypes
+            DRIVE_REMOTE = 4
+            return ctypes.windll.kernel32.GetDriveTypeW(os.path.splitdrive(path)[0] + "\\") == DRIVE_REMOTE
+        if os.path.exists("/proc/mounts"):
+            with open("/proc/mounts", "r", encoding="utf-8") as f:
+                mounts = [line.split()[1:3] for line in f if len(line.split()) >= 3]
+            mounts = [(point.replace("\\040", " "), fs_type) for point, fs_type in mounts]
+        else:
+            output = subprocess.run(["mount"], capture_output=True, text=True, timeout=5).stdout
+            mounts = [(m.group(1), m.group(2)) for m in re.finditer(r' on (.+?) \((\w+)', output)]
+    except Exception:
+        return False
+    best, best_type = "", ""
+    for point, fs_type in mounts:
+        inside = path == point or path.startswith(point.rstrip("/") + "/")
+        if inside and len(point) > len(best):
+            best, best_type = point, fs_type
+    return best_type.lower() in NETWORK_FS_TYPES
+
+class JobQueue:
+    """
+    SQLite 기반 임대(lease) 작업 큐.
+
+    같은 컴퓨터의 여러 프로세스가 같은 트랙 디렉토리를 동기화할 때 트랙을 나눠 처리하기 위해 사용합니다.
+    NFS/SMB 같은 네트워크 공유에서는 SQLite 파일 잠금을 신뢰할 수 없어 두 호스트가 같은 작업을
+    임대하거나 DB가 손상될 수 있으므로, 네트워크 공유에 있는 트랙 디렉토리에서는 큐를 만들지 않습니다.
+    작업자는 작업을 임대(claim)한 뒤 주기적으로 임대를 갱신(heartbeat)하고, 완료/실패를
+    소유자 확인과 함께 기록합니다. 작업자가 죽어 임대가 만료된 작업은 다른 작업자가 가져갑니다.
+    같은 작업을 두 작업자가 동시에 임대할 수 없으므로 한 트랙을 두 번 받지 않습니다.
+    """
+
+    def __init__(self, path, worker_id=None, lease_seconds=JOB_LEASE_SECONDS):
+        if _is_network_path(os.path.dirname(os.path.abspath(path))):
+            raise ValueError(f"공유 작업 큐는 로컬 디스크에서만 사용할 수 있습니다 (네트워크 공유): {path}")
+        self.path = path
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._held = set()
+        self._held_lock = threading.Lock()
+        self._heartbeat_stop = threading.Event()
+        self._heartbeat_thread = None
+        with self._transaction() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    owner TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL
+                )""")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority, created)")
+
+    def _connection(self):
+        # sqlite3 연결은 스레드마다 따로 사용 (close()에서 한꺼번에 닫을 수 있도록 스레드 확인은 끔)
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA busy_timeout = 30000")
+            self._local.db = db
+            with self._connections_lock:
+                self._connections.append(db)
+        return db
+
+    def _close_thread_connection(self):
+        """현재 스레드의 연결 닫기 (작업 스레드가 끝날 때)"""
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            self._local.db = None
+            with self._connections_lock:
+                if db in self._connections:
+                    self._connections.remove(db)
+            db.close()
+
+    def close(self):
+        """임대 갱신을 멈추고 모든 스레드의 연결을 닫음"""
+        self.stop_heartbeat()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for db in connections:
+            try:
+                db.close()
+            except sqlite3.Error:
+                pass
+
+    class _Transaction:
+        def __init__(self, db):
+            self.db = db
+
+        def __enter__(self):
+            self.db.execute("BEGIN IMMEDIATE")  # 쓰기 잠금을 먼저 잡아 임대 경쟁을 직렬화
+            return self.db
+
+        def __exit__(self, exc_type, exc, tb):
+            self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+            return False
+
+    def _transaction(self):
+        return self._Transaction(self._connection())
+
+    def enqueue(self, jobs):
+        """
+        작업을 추가합니다. 대기/진행 중이거나 최근에 완료된 작업은 건너뛰고,
+        실패로 끝났거나 오래전에 완료된 작업은 다시 대기 상태로 돌립니다.
+        이미 대기/진행 중인 작업도 새 priority가 더 앞서면(우선 재생목록) 우선순위를 올립니다.
+
+        Args:
+            jobs (list): (key, payload 딕셔너리, priority) 튜플 목록
+
+        Returns:
+            int: 새로 추가되었거나 다시 대기 상태가 된 작업 수
+        """
+        now = time.time()
+        added = 0
+        with self._transaction() as db:
+            for key, payload, priority in jobs:
+                cursor = db.execute("""
+                    INSERT INTO jobs (key, payload, priority, created, updated) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET
+                        payload = excluded.payload, priority = excluded.priority,
+                        status = 'pending', updated = excluded.updated
+                    WHERE jobs.status = 'failed' OR (jobs.status = 'done' AND jobs.updated < ?)""",
+                    (key, json.dumps(payload, ensure_ascii=False), priority, now, now, now - JOB_DONE_RETENTION))
+                added += cursor.rowcount
+                db.execute("UPDATE jobs SET priority = ? WHERE key = ? AND status IN ('pending', 'leased') "
+                           "AND priority > ?", (priority, key, priority))
+        return added
+
+    def claim(self, limit=1):
+        """
+        대기 중이거나 임대가 만료된 작업을 우선순위 순으로 최대 limit개 임대합니다.
+
+        Returns:
+            list: (key, payload 딕셔너리) 튜플 목록
+        """
+        now = time.time()
+        with self._transaction() as db:
+            rows = db.execute("""
+                SELECT key, payload FROM jobs
+                WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                ORDER BY priority, created LIMIT ?""", (now, limit)).fetchall()
+            for key, _ in rows:
+                db.execute("""
+                    UPDATE jobs SET status = 'leased', owner = ?, lease_expires = ?,
+                        attempts = attempts + 1, updated = ?
+                    WHERE key = ?""", (self.worker_id, now + self.lease_seconds, now, key))
+        with self._held_lock:
+            self._held.update(key for key, _ in rows)
+        return [(key, json.loads(payload)) for key, payload in rows]
+
+    def heartbeat(self):
+        """이 작업자가 임대 중인 작업들의 임대 기간을 연장"""
+        with self._held_lock:
+            keys = list(self._held)
+        if not keys:
+            return
+        now = time.time()
+        with self._transaction() as db:
+            for key in keys:
+                db.execute("""
+                    UPDATE jobs SET lease_expires = ?, updated = ?
+                    WHERE key = ? AND owner = ? AND status = 'leased'""",
+                    (now + self.lease_seconds, now, key, self.worker_id))
+
+    def _finish(self, key, status, error=None):
+        now = time.time()
+        with self._transaction() as db:
+            cursor = db.execute("""
+                UPDATE jobs SET status = ?, owner = NULL, lease_expires = NULL, last_error = ?, updated = ?
+                WHERE key = ? AND owner = ? AND status = 'leased'""",
+                (status, error, now, key, self.worker_id))
+        with self._held_lock:
+            self._held.discard(key)
+        return cursor.rowcount == 1
+
+    def complete(self, key):
+        """
+        작업 완료를 기록합니다.
+
+        Returns:
+            bool: 임대를 유지한 상태에서 기록했으면 True (임대가 만료되어 다른 작업자에게 넘어갔으면 False)
+        """
+        return self._finish(key, "done")
+
+    def fail(self, key, error):
+        return self._finish(key, "failed", error)
+
+    def release(self, key):
+        """중단 등으로 처리하지 못한 작업을 다시 대기 상태로 돌림"""
+        return self._finish(key, "pending")
+
+    def statuses(self, keys):
+        """작업 키 → 상태 딕셔너리"""
+        db = self._connection()
+        result = {}
+        keys = list(keys)
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = db.execute(f"SELECT key, status FROM jobs WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+            result.update(rows.fetchall())
+        return result
+
+    def counts(self):
+        db = self._connection()
+        return dict(db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def start_heartbeat(self, interval=JOB_HEARTBEAT_INTERVAL):
+        """임대 갱신 스레드 시작"""
+        self._heartbeat_stop.clear()
+
+        def beat():
+            try:
+                while not self._heartbeat_stop.wait(interval):
+                    try:
+                        self.heartbeat()
+                    except sqlite3.Error:
+                        pass  # 다음 주기에 다시 시도
+            finally:
+                self._close_thread_connection()
+
+        self._heartbeat_thread = threading.Thread(target=beat, daemon=True)
+        self._heartbeat_thread.start()
+
+    def stop_heartbeat(self):
+        self._heartbeat_stop.set()
+        if self._heartbeat_thread:
+            self._heartbeat_thread.join()
+            self._heartbeat_thread = None
+
+def _job_payload(track, playlist_id=None):
+    """트랙을 다른 작업자도 처리할 수 있는 자기 완결적 작업 내용으로 변환"""
+    if isinstance(track, TrackRecord):
+        return dict(track.to_dict(), type="yt", playlist_id=playlist_id)
+    return dict(track, type="tidal", playlist_id=playlist_id)
+
+def _track_from_job_payload(payload):
+    if payload.get("type") == "yt":
+        return TrackRecord(payload.get("video_id"), payload["title"], payload["artist"], payload.get("duration"))
+    return {k: v for k, v in payload.items() if k not in ("type", "playlist_id")}
+
+def _schedule_key(track):
+    """
+    스케줄러에서 트랙을 식별하는 키 (YouTube 레코드 / TIDAL 트랙 딕셔너리).
+
+    계획(plan)에서 TIDAL 트랙으로 바뀐 YouTube 곡은 원래 키(schedule_key)를 그대로 사용하여
+    일반 동기화와 재시도/보류 일정을 공유합니다.
+    """
+    if isinstance(track, TrackRecord):
+        return f"yt:{track.key}"
+    return track.get("schedule_key") or f"tidal:{track['id']}"
+
+def _download_failure_reason(result):
+    if result.get("rate_limited"):
+        return "rate_limited"
+    if result.get("unavailable"):
+        return "unavailable"
+    return "error"
+
+def _download_with_limiter(tidal_dl, track_url, logger, stop_flag, limiter, track_dir, config_path, result=None):
+    """다운로드 리미터 슬롯을 얻어 다운로드하고 결과(지연 시간, 전송량, 429)를 리미터에 반영"""
+    if result is None:
+        result = {}
+    if not limiter.acquire(stop_flag):
+        return False
+    started = time.time()
+    try:
+        ok = download_with_tidal_dl(tidal_dl, track_url, logger, stop_flag,
+                                    track_dir=track_dir, config_path=config_path, result=result)
+    finally:
+        limiter.release()
+    if result.get("rate_limited"):
+        limiter.record_throttle(started=started)
+    elif ok:
+        limiter.record_success(time.time() - started, result.get("bytes", 0))
+    return ok
+
+class RunProfiler:
+    """
+    실행 단계별 프로파일 수집기 (TIDAL_DOWNLOADER_PROFILE=1, --profile 또는 GUI 체크박스로 사용).
+
+    단계(stage)마다 cProfile 통계와 tracemalloc 스냅샷을 남기고, 선택적으로 지정한 스레드
+    (GUI의 Qt 메인 스레드)의 호출 스택을 주기적으로 샘플링하여 profile_<시각>/ 폴더에 저장합니다.
+    병렬 작업 스레드에서 실행된 코드는 _run_concurrently가 작업마다 따로 수집해 해당 단계에 합칩니다.
+    """
+
+    def __init__(self, out_dir=None, sample_thread=None, sample_interval=PROFILE_SAMPLE_INTERVAL):
+        self.out_dir = out_dir or os.path.abspath(f"profile_{time.strftime('%Y%m%d-%H%M%S')}")
+        self.sample_thread = sample_thread
+        self.sample_interval = sample_interval
+        self.stages = []
+        self._lock = threading.Lock()
+        self._stage = None
+        self._started_tracemalloc = False
+        self._previous_snapshot = None
+        self._samples = {}
+        self._sampler_stop = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        self._previous_snapshot = tracemalloc.take_snapshot()
+        if self.sample_thread:
+            self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+            self._sampler.start()
+
+    def stage(self, name):
+        """현재 단계를 마치고 새 단계를 시작 (호출한 스레드 기준)"""
+        self._end_stage()
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            profile = None  # 다른 프로파일러가 이미 동작 중인 스레드
+        with self._lock:
+            self._stage = {"name": name, "started": time.time(), "profile": profile, "workers": []}
+
+    def wrap(self, fn):
+        """작업 스레드에서 실행되는 함수의 프로파일을 현재 단계에 합치도록 감쌈"""
+        def profiled(*args, **kwargs):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+에서는 cProfile이 모든 스레드를 함께 수집하므로 단계 프로파일에 이미 포함됨
+                return fn(*args, **kwargs)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profile.disable()
+                with self._lock:
+                    if self._stage:
+                        self._stage["workers"].append(profile)
+        return profiled
+
+    def _end_stage(self):
+        with self._lock:
+            stage, self._stage = self._stage, None
+        if not stage:
+            return
+        if stage["profile"]:
+            stage["profile"].disable()
+        index = len(self.stages) + 1
+        prefix = os.path.join(self.out_dir, f"{index:02d}_{stage['name']}")
+        profiles = [p for p in [stage["profile"]] + stage["workers"] if p]
+        try:
+            stats = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                stats.add(profile)
+            stats.dump_stats(prefix + ".prof")
+            with open(prefix + ".txt", "w", encoding="utf-8") as f:
+                pstats.Stats(prefix + ".prof", stream=f).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+        except (TypeError, IndexError):
+            pass  # 수집된 호출이 없는 단계
+
+        # 프로파일러 자신의 할당은 제외
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, pstats.__file__),
+        ])
+        snapshot.dump(prefix + ".tracemalloc")
+        with open(prefix + "_memory.txt", "w", encoding="utf-8") as f:
+            f.write(f"# {stage['name']} 단계 동안 늘어난 메모리 (상위 {PROFILE_TOP_N}개)\n")
+            for diff in snapshot.compare_to(self._previous_snapshot, "lineno")[:PROFILE_TOP_N]:
+                f.write(f"{diff}\n")
+        self._previous_snapshot = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        self.stages.append({"name": stage["name"], "seconds": round(time.time() - stage["started"], 3),
+                            "worker_calls": len(stage["workers"]), "memory_current": current,
+                            "memory_peak": peak})
+
+    def _sample_loop(self):
+        while not self._sampler_stop.wait(self.sample_interval):
+            frame = sys._current_frames().get(self.sample_thread)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self._samples[key] = self._samples.get(key, 0) + 1
+
+    def stop(self):
+        """마지막 단계를 마치고 요약(summary.json)과 스택 샘플을 저장"""
+        self._end_stage()
+        if self._sampler:
+            self._sampler_stop.set()
+            self._sampler.join()
+            # flamegraph.pl / speedscope에서 바로 열 수 있는 folded 형식
+            with open(os.path.join(self.out_dir, "main_thread_stacks.folded"), "w", encoding="utf-8") as f:
+                for stack, count in sorted(self._samples.items(), key=lambda item: -item[1]):
+                    f.write(f"{stack} {count}\n")
+        _write_json_atomic(os.path.join(self.out_dir, "summary.json"), {
+            "stages": self.stages,
+            "main_thread_samples": sum(self._samples.values()),
+            "sample_interval": self.sample_interval,
+        })
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+_active_profiler = None
+
+def _profile_stage(name):
+    """프로파일링 중이면 새 단계 시작"""
+    if _active_profiler:
+        _active_profiler.stage(name)
+
+def _run_concurrently(items, worker, limiters):
+    """
+    items의 각 항목에 worker를 병렬로 실행하고 입력 순서대로 결과를 반환합니다.
+
+    실제 동시 실행 수는 worker 안에서 리미터가 조절하므로, 스레드 수는 리미터 최대치의 합으로 둡니다.
+    """
+    max_workers = max(1, sum(l.max_limit for l in limiters))
+    if _active_profiler:
+        worker = _active_profiler.wrap(worker)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(worker, items))
+
+def _log_deferred(deferred, scheduler, logger):
+    """백오프/보류 중이라 이번에 건너뛰는 곡 요약"""
+    if not deferred:
+        return
+    parked = sum(1 for t in deferred if scheduler.entry(_schedule_key(t)).get("status") == "parked")
+    logger(f"[+] 재시도 대기 중인 곡 {len(deferred) - parked}개, TIDAL에 없어 보류된 곡 {parked}개 건너뜀")
+
+def _download_track(t, idx, tidal_dl, headers, track_dir, logger, stop_flag, config_path, limiters,
+                    scheduler=None, playlist_id=None, ledger=None):
+    """
+    트랙 하나(YouTube TrackRecord는 검색 후, TIDAL 트랙은 URL로 바로)를 다운로드합니다.
+
+    Returns:
+        tuple: (성공 여부 - 중단으로 시도하지 못했으면 None, 실패 유형)
+    """
+    # 중단 요청 확인
+    if stop_flag and stop_flag():
+        return None, None
+        
+    track_logger = lambda msg: logger(f"[{idx:02d}] {msg}")
+    search_result = {}
+    download_result = {}
+    if isinstance(t, TrackRecord):
         logger(f"[{idx:02d}] 🎵 {t['title']} - {t['artist']}")
-        track_url = search_tidal_track(t['title'], t['artist'], headers, logger)
-        if track_url:
-            if not download_with_tidal_dl(tidal_dl, track_url, logger, stop_flag):
-                failed.append(t)
+        track_url = search_tidal_track(t['title'], t['artist'], headers, track_logger, limiters["search"],
+                                       t['duration'], search_result, stop_flag)
+    else:
+        logger(f"[{idx:02d}] 🎵 트랙 ID: {t['id']}" + (f" ({t['title']})" if t.get('title') else ""))
+        track_url = t['url']
+    ok = False
+    existing = []
+    if track_url and ledger:
+        # 이미 받은 TIDAL 트랙이면 tidal-dl-ng를 실행하지 않음 (빈 스테이징 디렉토리라 자체 건너뛰기가 안 됨)
+        track_id = re.search(r'track/(\d+)', track_url)
+        existing = ledger.existing_files(track_id.group(1)) if track_id else []
+    if existing:
+        track_logger(f"[+] 이미 라이브러리에 있는 트랙이므로 건너뜀: {os.path.basename(existing[0])}")
+        ok = True
+    elif track_url:
+        ok = _download_with_limiter(tidal_dl, track_url, track_logger, stop_flag,
+                                    limiters["download"], track_dir, config_path, download_result)
+    if stop_flag and stop_flag() and not ok:
+        return None, None
+    reason = None if ok else (_download_failure_reason(download_result) if track_url else search_result["reason"])
+    if ok and ledger and not existing:
+        ledger.record(download_result.get("files", []), track_url, _provenance_source(t, playlist_id))
+    if scheduler:
+        if ok:
+            scheduler.record_success(_schedule_key(t), playlist_id)
         else:
-            failed.append(t)
-        time.sleep(1)
-    return failed
+            scheduler.record_failure(_schedule_key(t), reason, playlist_id)
+    return ok, reason
+
+def _download_via_queue(job_queue, tidal_dl, headers, track_dir, logger, stop_flag, config_path, limiters,
+                        scheduler=None, ledger=None):
+    """
+    공유 작업 큐가 빌 때까지 작업을 임대하여 처리합니다.
+
+    현재 다운로드 동시 실행 수만큼씩 임대하므로 작업자가 늘어날수록 처리량이 늘어나고,
+    이 작업자가 죽더라도 임대가 만료되면 다른 작업자가 이어서 처리합니다.
+
+    Returns:
+        int: 이 작업자가 처리한 작업 수
+    """
+    processed = 0
+    job_queue.start_heartbeat()
+    try:
+        while not (stop_flag and stop_flag()):
+            jobs = job_queue.claim(limit=max(1, limiters["download"].limit))
+            if not jobs:
+                break
+
+            def worker(job):
+                key, payload = job
+                idx = processed + jobs.index(job) + 1
+                try:
+                    ok, reason = _download_track(_track_from_job_payload(payload), idx, tidal_dl, headers,
+                                                 track_dir, logger, stop_flag, config_path, limiters, scheduler,
+                                                 payload.get("playlist_id"), ledger)
+                    if ok is None:
+                        job_queue.release(key)
+                    elif ok:
+                        if not job_queue.complete(key):
+                            logger(f"⚠️ 작업 임대가 만료된 뒤 완료되었습니다: {key}")
+                    else:
+                        job_queue.fail(key, reason)
+                    return ok
+                finally:
+                    # 임대 묶음마다 스레드 풀이 새로 만들어지므로 스레드별 연결을 바로 닫음
+                    job_queue._close_thread_connection()
+
+            _run_concurrently(jobs, worker, limiters.values())
+            processed += len(jobs)
+    finally:
+        job_queue.stop_heartbeat()
+    counts = job_queue.counts()
+    logger(f"[+] 공유 작업 큐: 이 작업자가 처리 {processed}개 / 완료 {counts.get('done', 0)}, "
+           f"실패 {counts.get('failed', 0)}, 진행 중 {counts.get('leased', 0)}, 대기 {counts.get('pending', 0)}")
+    return processed
+
+def try_download(tracks, tidal_dl, headers, track_dir, logger, stop_flag=None, config_path=None, limiters=None,
+                 scheduler=None, playlist_id=None, job_queue=None, ledger=None):
+    """
+    트랙들을 검색/다운로드하고 실패한 트랙 목록을 반환합니다.
+
+    scheduler가 주어지면 재시도 시각이 되지 않은 곡은 건너뛰고(실패 목록에도 넣지 않음),
+    우선순위대로 시도한 뒤 결과와 실패 유형을 기록합니다.
+    job_queue가 주어지면 트랙을 공유 작업 큐에 넣고 다른 작업자와 나눠 처리합니다.
+    ledger가 주어지면 받은 파일마다 TIDAL 트랙 ID와 원본 항목을 기록합니다.
+    """
+    limiters = limiters or load_rate_limiters("")
+    if scheduler:
+        tracks, deferred = scheduler.order(tracks, _schedule_key, playlist_id, lambda t: t['duration'])
+        _log_deferred(deferred, scheduler, logger)
+
+    if job_queue:
+        keys = [_schedule_key(t) for t in tracks]
+        # 우선 재생목록의 작업은 다른 실행/작업자가 넣은 작업보다 한 구간 앞에 둠
+        bands = [scheduler.priority_band(key, playlist_id) if scheduler else JOB_PRIORITY_BAND for key in keys]
+        added = job_queue.enqueue([(key, _job_payload(t, playlist_id), band + index)
+                                   for index, (key, t, band) in enumerate(zip(keys, tracks, bands))])
+        logger(f"[+] 공유 작업 큐에 {added}개 작업 추가 (이미 있거나 완료된 작업 제외)")
+        while True:
+            _download_via_queue(job_queue, tidal_dl, headers, track_dir, logger, stop_flag, config_path,
+                                limiters, scheduler, ledger)
+            statuses = job_queue.statuses(keys)
+            if stop_flag and stop_flag():
+                logger("⚠️ 사용자 요청으로 다운로드가 중단되었습니다.")
+                break
+            # 다른 작업자가 처리 중인 곡은 끝나거나 임대가 만료될 때까지 기다림
+            busy = sum(1 for key in keys if statuses.get(key) in ("pending", "leased"))
+            if not busy:
+                break
+            logger(f"[+] 다른 작업자가 처리 중인 곡 {busy}개 대기 중...")
+            for _ in range(JOB_POLL_INTERVAL * 10):
+                if stop_flag and stop_flag():
+                    break
+                time.sleep(0.1)
+        # 중단으로 아직 끝나지 않은 곡은 실패 목록에 넣지 않음
+        return [t for key, t in zip(keys, tracks) if statuses.get(key) == "failed"]
+
+    def worker(indexed):
+        idx, t = indexed
+        return _download_track(t, idx, tidal_dl, headers, track_dir, logger, stop_flag, config_path,
+                               limiters, scheduler, playlist_id, ledger)[0]
+
+    results = _run_concurrently(list(enumerate(tracks, start=1)), worker, limiters.values())
+    if stop_flag and stop_flag():
+        logger("⚠️ 사용자 요청으로 다운로드가 중단되었습니다.")
+    # 중단으로 시도하지 못한 곡(None)은 실패 목록에 넣지 않음
+    return [t for t, ok in zip(tracks, results) if ok is False]
 
 def verify_audio_file(file_path, logger):
     """
@@ -493,9 +2392,257 @@ def verify_downloaded_files(track_dir, logger):
                 
     return corrupted_files
 
-def retry_corrupted_downloads(corrupted_files, tidal_dl, headers, track_dir, logger):
+def _id3v2_size(header):
+    """ID3v2 헤더(10바이트)로 태그 전체 크기 계산 (태그가 아니면 0)"""
+    if len(header) < 10 or header[:3] != b"ID3":
+        return 0
+    size = 0
+    for b in header[6:10]:
+        size = (size << 7) | (b & 0x7F)  # syncsafe 정수
+    footer = 10 if header[5] & 0x10 else 0
+    return 10 + size + footer
+
+def _audio_payload_ranges(path):
+    """
+    태그/메타데이터를 제외한 오디오 데이터의 (오프셋, 길이) 목록을 헤더만 읽어 계산합니다.
+
+    FLAC은 메타데이터 블록 이후, MP3는 ID3v2/APEv2/ID3v1 태그를 뺀 부분, M4A는 mdat 박스,
+    WAV는 data 청크를 오디오 데이터로 봅니다. 형식을 해석하지 못하면 파일 전체를 사용합니다.
+    """
+    file_size = os.path.getsize(path)
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        with open(path, "rb") as f:
+            if ext == ".flac":
+                offset = _id3v2_size(f.read(10))  # 일부 도구가 FLAC 앞에 붙이는 ID3 태그
+                f.seek(offset)
+                if f.read(4) == b"fLaC":
+                    offset += 4
+                    while True:
+                        block = f.read(4)
+                        if len(block) < 4:
+                            break
+                        length = int.from_bytes(block[1:4], "big")
+                        offset += 4 + length
+                        if block[0] & 0x80:  # 마지막 메타데이터 블록
+                            return [(offset, max(0, file_size - offset))]
+                        f.seek(offset)
+            elif ext == ".mp3":
+                start = 0
+                while True:  # 태그가 여러 개 붙은 경우도 있음
+                    f.seek(start)
+                    size = _id3v2_size(f.read(10))
+                    if not size:
+                        break
+                    start += size
+                end = file_size
+                if end - start >= 128:
+                    f.seek(end - 128)
+                    if f.read(3) == b"TAG":
+                        end -= 128
+                if end - start >= 32:
+                    f.seek(end - 32)
+                    footer = f.read(32)
+                    if footer[:8] == b"APETAGEX":
+                        size = int.from_bytes(footer[12:16], "little")
+                        has_header = int.from_bytes(footer[20:24], "little") & 0x80000000
+                        end -= size + (32 if has_header else 0)
+                if start < end:
+                    return [(start, end - start)]
+            elif ext == ".m4a":
+                ranges = []
+                offset = 0
+                while offset + 8 <= file_size:
+                    f.seek(offset)
+                    header = f.read(8)
+                    size = int.from_bytes(header[:4], "big")
+                    header_size = 8
+                    if size == 1:  # 64비트 크기
+                        size = int.from_bytes(f.read(8), "big")
+                        header_size = 16
+                    elif size == 0:  # 파일 끝까지
+                        size = file_size - offset
+                    if size < header_size:
+                        break
+                    if header[4:8] == b"mdat":
+                        ranges.append((offset + header_size, min(size, file_size - offset) - header_size))
+                    offset += size
+                if ranges:
+                    return ranges
+            elif ext == ".wav":
+                if f.read(12)[8:12] == b"WAVE":
+                    offset = 12
+                    while offset + 8 <= file_size:
+                        f.seek(offset)
+                        header = f.read(8)
+                        size = int.from_bytes(header[4:8], "little")
+                        if header[:4] == b"data":
+                            return [(offset + 8, min(size, file_size - offset - 8))]
+                        offset += 8 + size + (size & 1)  # 청크는 2바이트 정렬
+    except OSError:
+        pass
+    return [(0, file_size)]
+
+def _hash_audio_payload(path, ranges):
+    """오디오 데이터 범위만 메모리 매핑으로 나눠 읽어 해시 (태그가 달라도 같은 음원이면 같은 값)"""
+    hasher = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hasher.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for offset, length in ranges:
+                for start in range(offset, offset + length, HASH_CHUNK_SIZE):
+                    hasher.update(mm[start:min(start + HASH_CHUNK_SIZE, offset + length)])
+    return hasher.hexdigest()
+
+def _load_audio_hashes(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == AUDIO_HASH_VERSION:
+            return data.get("files", {})
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+def _pick_duplicate_keeper(paths):
+    """중복 그룹에서 남길 파일 - 가장 먼저 받은 파일, 같으면 (1) 같은 꼬리표가 없는 짧은 이름"""
+    return min(paths, key=lambda p: (os.path.getmtime(p), len(os.path.basename(p)), p))
+
+def find_duplicate_tracks(track_dir, logger, action="report", stop_flag=None):
+    """
+    Tracks 폴더에서 태그만 다르고 음원은 같은 중복 파일을 찾아 보고하거나 정리합니다.
+
+    오디오 데이터 크기로 먼저 묶고, 크기가 같은 후보만 오디오 데이터를 병렬로 해시합니다.
+    계산한 값은 Tracks/.audio_hashes.json에 저장하여 다음 검사에서는 새로 생기거나 바뀐 파일만 읽습니다.
+
+    Args:
+        track_dir (str): 트랙 디렉토리 경로
+        logger (callable): 로깅 함수
+        action (str): "report"(보고만), "hardlink"(중복을 하드 링크로 교체), "remove"(중복 삭제)
+        stop_flag (callable): 중단 요청 확인 함수
+
+    Returns:
+        list: 중복 그룹 목록 - {"keep": 남길 파일, "duplicates": [중복 파일], "size": 파일당 크기}
+    """
+    if action not in DEDUP_ACTIONS:
+        raise ValueError(f"알 수 없는 중복 처리 방식: {action}")
+    tracks_path = os.path.join(track_dir, "Tracks")
+    if not os.path.exists(tracks_path):
+        logger("❌ Tracks 디렉토리를 찾을 수 없습니다.")
+        return []
+
+    hash_file = os.path.join(tracks_path, AUDIO_HASH_FILE_NAME)
+    cached = _load_audio_hashes(hash_file)
+    entries = {}
+    inodes = {}
+    with os.scandir(tracks_path) as it:
+        for entry in it:
+            if not (entry.is_file() and entry.name.lower().endswith(AUDIO_EXTENSIONS)):
+                continue
+            st = entry.stat()
+            # 이미 하드 링크로 합쳐진 파일은 하나로 취급
+            inode = (st.st_dev, st.st_ino)
+            if st.st_ino and inode in inodes:
+                continue
+            inodes[inode] = entry.name
+            previous = cached.get(entry.name)
+            if previous and previous.get("size") == st.st_size and previous.get("mtime") == st.st_mtime:
+                entries[entry.name] = previous
+            else:
+                entries[entry.name] = {"size": st.st_size, "mtime": st.st_mtime}
+
+    def locate(name):
+        entry = entries[name]
+        if "ranges" not in entry:
+            entry["ranges"] = _audio_payload_ranges(os.path.join(tracks_path, name))
+        return entry
+
+    # 1단계: 확장자와 오디오 데이터 크기로 묶기 (헤더만 읽음)
+    names = sorted(entries)
+    workers = min(DEDUP_MAX_WORKERS, (os.cpu_count() or 1) * 2)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(locate, names))
+    buckets = {}
+    for name in names:
+        payload_size = sum(length for _, length in entries[name]["ranges"])
+        buckets.setdefault((os.path.splitext(name)[1].lower(), payload_size), []).append(name)
+    candidates = [name for bucket in buckets.values() if len(bucket) > 1 for name in bucket]
+
+    # 2단계: 후보만 오디오 데이터 해시 (저장된 해시가 있으면 재사용)
+    to_hash = [name for name in candidates if "hash" not in entries[name]]
+    logger(f"[+] 중복 검사: 파일 {len(names)}개, 후보 {len(candidates)}개, 새로 해시할 파일 {len(to_hash)}개")
+
+    def digest(name):
+        if stop_flag and stop_flag():
+            return
+        try:
+            entries[name]["hash"] = _hash_audio_payload(os.path.join(tracks_path, name), entries[name]["ranges"])
+        except (OSError, ValueError) as e:
+            logger(f"⚠️ 해시 계산 실패: {name} - {e}")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(digest, to_hash))
+    try:
+        _write_json_atomic(hash_file, {"version": AUDIO_HASH_VERSION, "files": entries})
+        os.utime(hash_file, None)
+    except OSError:
+        pass  # 해시 저장 실패는 무시 (다음 검사에서 다시 계산)
+    if stop_flag and stop_flag():
+        logger("⚠️ 사용자 요청으로 중복 검사가 중단되었습니다.")
+        return []
+
+    by_hash = {}
+    for name in candidates:
+        if "hash" in entries[name]:
+            key = (os.path.splitext(name)[1].lower(), entries[name]["hash"])
+            by_hash.setdefault(key, []).append(os.path.join(tracks_path, name))
+    groups = []
+    for paths in by_hash.values():
+        if len(paths) < 2:
+            continue
+        keep = _pick_duplicate_keeper(paths)
+        groups.append({"keep": keep, "duplicates": sorted(p for p in paths if p != keep),
+                       "size": os.path.getsize(keep)})
+
+    if not groups:
+        logger("✅ 중복 파일이 없습니다.")
+        return groups
+
+    wasted = sum(g["size"] * len(g["duplicates"]) for g in groups)
+    logger(f"[+] 중복 그룹 {len(groups)}개, 중복 파일 {sum(len(g['duplicates']) for g in groups)}개 "
+           f"({wasted / 1024 ** 2:.1f} MB)")
+    for group in groups:
+        logger(f"[DUP] {os.path.basename(group['keep'])}")
+        for path in group["duplicates"]:
+            try:
+                if action == "hardlink":
+                    # 파일명은 유지하여 이름 기반 매칭에는 그대로 보이게 함
+                    tmp_path = os.path.join(tracks_path, f".dedup-{uuid.uuid4().hex}")
+                    os.link(group["keep"], tmp_path)
+                    os.replace(tmp_path, path)
+                    logger(f"   🔗 {os.path.basename(path)}")
+                elif action == "remove":
+                    os.remove(path)
+                    logger(f"   🗑️ {os.path.basename(path)}")
+                else:
+                    logger(f"   = {os.path.basename(path)}")
+            except OSError as e:
+                logger(f"⚠️ 중복 처리 실패: {os.path.basename(path)} - {e}")
+
+    with open("duplicate_tracks.json", "w", encoding="utf-8") as f:
+        json.dump(groups, f, ensure_ascii=False, indent=2)
+    logger("중복 파일 목록이 duplicate_tracks.json에 저장되었습니다.")
+    return groups
+
+def retry_corrupted_downloads(corrupted_files, tidal_dl, headers, track_dir, logger, config_path=None, limiters=None,
+                              ledger=None, stop_flag=None):
     """
     손상된 파일들을 삭제하고 재다운로드를 시도합니다.
+
+    출처 기록이 있는 파일은 기록된 TIDAL 트랙 ID로 검색 없이 바로 다시 받고, 기록이 없는 파일만
+    파일명(tidal-dl-ng 기본 형식 "아티스트 - 제목")으로 검색합니다. 모두 일반 다운로드와 같은
+    병렬 경로(try_download)로 처리합니다.
     
     Args:
         corrupted_files (list): 손상된 파일들의 경로 목록
@@ -503,25 +2650,23 @@ def retry_corrupted_downloads(corrupted_files, tidal_dl, headers, track_dir, log
         headers (dict): API 요청 헤더
         track_dir (str): 트랙 디렉토리 경로
         logger (callable): 로깅 함수
+        config_path (str): tidal-dl-ng settings.json 경로 (스테이징 다운로드용)
+        limiters (dict): load_rate_limiters가 반환한 검색/다운로드 리미터
+        ledger (ProvenanceLedger): 파일별 출처 기록
+        stop_flag (callable): 중단 요청 확인 함수
     """
     if not corrupted_files:
         logger("✅ 모든 파일이 정상입니다!")
         return
+    limiters = limiters or load_rate_limiters("")
+    ledger = ledger or ProvenanceLedger(track_dir)
         
     logger(f"\n[+] {len(corrupted_files)}개의 손상된 파일 재다운로드 시작")
     
+    tracks = []
     for file_path in corrupted_files:
         filename = os.path.basename(file_path)
-        name = os.path.splitext(filename)[0]
-        
-        # 파일명에서 아티스트와 제목 추출
-        if ' - ' in name:
-            artist, title = name.split(' - ', 1)
-        else:
-            # 구분자가 없는 경우 전체를 제목으로 취급
-            artist, title = "", name
-            
-        logger(f"\n[+] 재다운로드 시도: {filename}")
+        provenance = ledger.get(filename)
         
         # 기존 파일 삭제
         try:
@@ -530,20 +2675,38 @@ def retry_corrupted_downloads(corrupted_files, tidal_dl, headers, track_dir, log
         except Exception as e:
             logger(f"⚠️ 파일 삭제 실패: {filename} - {e}")
             continue
-            
-        # Tidal에서 검색 및 다운로드
-        track_url = search_tidal_track(title, artist, headers, logger)
-        if track_url:
-            if download_with_tidal_dl(tidal_dl, track_url, logger):
-                logger(f"✅ 재다운로드 성공: {filename}")
-            else:
-                logger(f"❌ 재다운로드 실패: {filename}")
+        ledger.forget(filename)
+
+        if provenance and provenance.get("tidal_id"):
+            logger(f"[+] 재다운로드 대상 (트랙 ID {provenance['tidal_id']}): {filename}")
+            source = provenance.get("source") or {}
+            tracks.append({"id": provenance["tidal_id"], "url": provenance["url"], "title": filename,
+                           "duration": source.get("duration"), "source": source})
+            continue
+
+        # 출처 기록이 없는 파일은 파일명에서 아티스트와 제목을 추출하여 검색
+        name = os.path.splitext(filename)[0]
+        if ' - ' in name:
+            artist, title = name.split(' - ', 1)
         else:
-            logger(f"❌ Tidal에서 트랙을 찾을 수 없습니다: {filename}")
-        
-        time.sleep(1)  # API 요청 간격 조절
+            # 구분자가 없는 경우 전체를 제목으로 취급
+            artist, title = "", name
+        logger(f"[+] 재다운로드 대상 (검색): {filename}")
+        tracks.append(TrackRecord(None, title, artist))
 
-def get_tracks_from_tidal_playlist(playlist_url, headers, logger):
+    try:
+        failed = try_download(tracks, tidal_dl, headers, track_dir, logger, stop_flag, config_path, limiters,
+                              ledger=ledger)
+    finally:
+        ledger.save()
+    if stop_flag and stop_flag():
+        return
+    for t in failed:
+        logger(f"❌ 재다운로드 실패: {t['title']}" + (f" - {t['artist']}" if isinstance(t, TrackRecord) else ""))
+    if len(failed) < len(tracks):
+        logger(f"✅ 재다운로드 성공: {len(tracks) - len(failed)}개")
+
+def get_tracks_from_tidal_playlist(playlist_url, headers, logger, limiter=None, stop_flag=None):
     """
     Tidal 플레이리스트에서 트랙 목록을 가져옵니다.
     
@@ -551,6 +2714,8 @@ def get_tracks_from_tidal_playlist(playlist_url, headers, logger):
         playlist_url (str): Tidal 플레이리스트 URL
         headers (dict): API 요청 헤더
         logger (callable): 로깅 함수
+        limiter (AdaptiveLimiter): 트랙 정보 일괄 조회에 사용할 리미터
+        stop_flag (callable): 중단 요청 여부를 반환하는 함수
         
     Returns:
         list: 트랙 정보 목록
@@ -586,6 +2751,11 @@ def get_tracks_from_tidal_playlist(playlist_url, headers, logger):
         track_count = len(tracks_data)
         logger(f"[+] 총 {track_count}개 트랙 발견")
         
+        # 제목/재생 시간 등 트랙 속성: included에 있으면 그대로 쓰고, 없는 것만 일괄 조회
+        store_tidal_track_metadata(tracks_data)
+        metadata = fetch_tidal_track_metadata([item.get("id") for item in tracks_data if item.get("id")],
+                                              headers, logger, limiter, stop_flag)
+        
         tracks = []
         for idx, item in enumerate(tracks_data, 1):
             if idx % 20 == 0:
@@ -593,9 +2763,12 @@ def get_tracks_from_tidal_playlist(playlist_url, headers, logger):
             
             track_id = item.get("id")
             if track_id:
+                info = metadata.get(str(track_id), {})
                 tracks.append({
                     "id": track_id,
-                    "url": f"https://tidal.com/browse/track/{track_id}"
+                    "url": f"https://tidal.com/browse/track/{track_id}",
+                    "title": info.get("title"),
+                    "duration": info.get("duration"),
                 })
                 
         return tracks
@@ -603,36 +2776,517 @@ def get_tracks_from_tidal_playlist(playlist_url, headers, logger):
         logger(f"❌ Tidal API 오류: {e}")
         return []
 
-def run_downloader(track_dir, tidal_dl, playlist_url, client_id, client_secret, logger, is_tidal_playlist=False, stop_flag=None):
+def _snapshot_path(source, playlist_id):
+    return os.path.join(SNAPSHOT_DIR, f"{source}-{re.sub(r'[^a-zA-Z0-9_-]', '_', playlist_id)}.json")
+
+def load_playlist_snapshot(source, playlist_id):
+    """
+    마지막 동기화 때 저장한 플레이리스트 스냅샷을 불러옵니다.
+
+    Returns:
+        dict: 트랙 키(videoId / TIDAL ID) → {"state", "title", "artist", "updated"}
+    """
+    try:
+        with open(_snapshot_path(source, playlist_id), "r", encoding="utf-8") as f:
+            return json.load(f).get("entries", {})
+    except Exception:
+        return {}
+
+def save_playlist_snapshot(source, playlist_id, entries):
+    """플레이리스트 스냅샷 저장 (실패는 무시)"""
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        _write_json_atomic(_snapshot_path(source, playlist_id), {"updated": time.time(), "entries": entries})
+    except Exception:
+        pass
+
+def diff_playlist_snapshot(snapshot, current_keys):
+    """
+    스냅샷과 현재 플레이리스트를 비교합니다.
+
+    Returns:
+        tuple: (새로 추가되었거나 아직 해결되지 않은 키 집합, 플레이리스트에서 삭제된 키 집합)
+    """
+    added = {k for k in current_keys if snapshot.get(k, {}).get("state") not in RESOLVED_STATES}
+    removed = set(snapshot) - set(current_keys)
+    return added, removed
+
+def _report_removed_tracks(snapshot, removed, report_removed, logger):
+    """플레이리스트에서 삭제된 곡을 로그에 남기고, 요청 시 removed_tracks.json으로 저장"""
+    if not removed:
+        return
+    logger(f"\n[+] 지난 동기화 이후 플레이리스트에서 삭제된 곡 {len(removed)}개")
+    if report_removed:
+        removed_entries = [dict(snapshot[k], key=k) for k in sorted(removed)]
+        for entry in removed_entries:
+            logger(f"[REMOVED] {entry.get('title', '')} - {entry.get('artist', '')}")
+        with open("removed_tracks.json", "w", encoding="utf-8") as f:
+            json.dump(removed_entries, f, ensure_ascii=False, indent=2)
+        logger("삭제된 곡 목록이 removed_tracks.json에 저장되었습니다.")
+
+class LocalLibrary:
+    """
+    라이브러리 파일 색인과 매칭 결과 기록 (Tracks/.match_index.json).
+
+    파일마다 크기/수정 시간과 색인에 처음 나타난 세대(generation)를 기록하고, 파일이 추가/변경되면
+    세대를 올립니다. 재생목록 곡의 매칭 결과는 (정규화 패턴, 기준값) 별로 결정한 세대와 함께 저장하여
+    - 일치한 파일이 그대로 있으면 비교 없이 재사용하고,
+    - 일치하는 파일이 없었다면 그 이후 추가/변경된 파일하고만 비교합니다.
+    라이브러리가 바뀌지 않은 재동기화에서는 유사도 비교를 전혀 하지 않습니다.
+    """
+
+    def __init__(self, track_dir):
+        self.tracks_path = os.path.join(track_dir, "Tracks")
+        self.path = os.path.join(self.tracks_path, MATCH_INDEX_FILE_NAME)
+        self._lock = threading.Lock()
+        self._names = {}
+        self.hits = 0
+        self.comparisons = 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            data = {}
+        if data.get("version") != MATCH_INDEX_VERSION:
+            data = {}
+        self.generation = data.get("generation", 0)
+        self.files = data.get("files", {})
+        # 정규화 방식이 바뀌면 매칭 결과만 버림 (파일 색인은 그대로 사용)
+        same_normalizer = data.get("normalizer") == normalizer_signature()
+        self.decisions = data.get("decisions", {}) if same_normalizer else {}
+        self.refresh()
+
+    def refresh(self):
+        """Tracks 폴더를 다시 읽어 추가/변경/삭제된 파일을 색인에 반영"""
+        os.makedirs(self.tracks_path, exist_ok=True)
+        current = {}
+        with os.scandir(self.tracks_path) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.lower().endswith(AUDIO_EXTENSIONS):
+                    st = entry.stat()
+                    current[entry.name] = (st.st_size, st.st_mtime)
+        with self._lock:
+            changed = [name for name, (size, mtime) in current.items()
+                       if (self.files.get(name) or {}).get("size") != size
+                       or self.files[name].get("mtime") != mtime]
+            removed = set(self.files) - set(current)
+            if changed or removed:
+                self.generation += 1
+            for name in removed:
+                del self.files[name]
+            for name in changed:
+                size, mtime = current[name]
+                self.files[name] = {"size": size, "mtime": mtime, "added": self.generation}
+
+    def _names_for(self, filename):
+        names = self._names.get(filename)
+        if names is None:
+            names = self._names[filename] = _local_track_names(filename)
+            if DEBUG:
+                print(f"[LOCAL] {filename} → norm1: {names[0]} / norm2: {names[1]}")
+        return names
+
+    def match(self, t, threshold, logger):
+        """
+        트랙과 일치하는 로컬 파일을 찾습니다.
+
+        Returns:
+            tuple | None: (일치한 파일명, 유사도), 없으면 None
+        """
+        key = f"{threshold}|" + "\x1f".join(t['patterns'])
+        with self._lock:
+            decision = self.decisions.get(key)
+            generation = self.generation
+            if decision and decision["match"]:
+                entry = self.files.get(decision["match"])
+                if entry and entry["added"] <= decision["generation"]:
+                    self.hits += 1
+                    return decision["match"], decision["similarity"]
+                candidates = list(self.files)  # 일치했던 파일이 바뀌거나 삭제됨
+            elif decision:
+                if decision["generation"] >= generation:
+                    self.hits += 1
+                    return None
+                candidates = [name for name, entry in self.files.items()
+                              if entry["added"] > decision["generation"]]
+            else:
+                candidates = list(self.files)
+
+        found = None
+        for p in t['patterns']:
+            for name in candidates:
+                for l in self._names_for(name):
+                    self.comparisons += 1
+                    sim = similar(p, l)
+                    if DEBUG: logger(f"[DEBUG] comparing '{p}' vs '{l}' → {sim:.2f}")
+                    if sim > threshold:
+                        if DEBUG: logger(f"[SIMILAR] {p} ≈ {l} → {sim:.2f}")
+                        found = (name, sim)
+                        break
+                if found:
+                    break
+            if found:
+                break
+
+        with self._lock:
+            self.decisions[key] = {"match": found[0] if found else None,
+                                   "similarity": round(found[1], 4) if found else None,
+                                   "generation": generation}
+        return found
+
+    def save(self):
+        with self._lock:
+            data = {"version": MATCH_INDEX_VERSION, "normalizer": normalizer_signature(),
+                    "generation": self.generation, "files": dict(self.files), "decisions": dict(self.decisions)}
+        try:
+            _write_json_atomic(self.path, data)
+            os.utime(self.path, None)
+        except OSError:
+            pass  # 색인 저장 실패는 무시 (다음 실행에서 다시 비교)
+
+def _verify_library(track_dir, tidal_dl, headers, config_path, limiters, ledger, logger, stop_flag=None):
+    """다운로드 후 라이브러리 전체 무결성 검사 및 손상된 파일 재다운로드"""
+    # 중단되지 않은 경우에만 파일 무결성 검사 실행
+    if not (stop_flag and stop_flag()):
+        # 다운로드 완료 후 파일 무결성 검사
+        _profile_stage("verify")
+        logger("\n[+] 다운로드된 파일 무결성 검사 시작...")
+        corrupted_files = verify_downloaded_files(track_dir, logger)
+        
+        if corrupted_files:
+            logger(f"\n⚠️ {len(corrupted_files)}개의 손상된 파일이 발견되었습니다.")
+            retry_corrupted_downloads(corrupted_files, tidal_dl, headers, track_dir, logger, config_path, limiters,
+                                      ledger, stop_flag)
+        else:
+            logger("\n✅ 모든 파일이 정상적으로 다운로드되었습니다!")
+
+def _format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
+
+def plan_sync(track_dir, playlist_url, client_id, client_secret, logger, is_tidal_playlist=False, stop_flag=None,
+              delta_sync=False, plan_file=PLAN_FILE):
+    """
+    다운로드 없이 동기화 계획을 세웁니다 (dry run).
+
+    플레이리스트를 가져와 로컬 라이브러리와 매칭하고, 받을 곡을 TIDAL에서 찾아 작업 목록을 만든 뒤
+    예상 용량(재생 시간 × LOSSLESS 비트레이트), 이전 실행의 다운로드 처리량으로 계산한 예상 시간,
+    Tracks 파일 시스템의 남은 공간을 함께 plan_file에 저장합니다.
+    저장한 계획은 run_downloader(plan_file=...)로 검색을 반복하지 않고 바로 실행할 수 있습니다.
+
+    Returns:
+        dict | None: 저장한 계획 (토큰 발급 실패 또는 중단 시 None)
+    """
+    logger("[+] 액세스 토큰 요청 중...")
+    access_token = get_tidal_access_token(client_id, client_secret, logger)
+    if not access_token:
+        return None
+
+    headers = {"Authorization": f"Bearer {access_token}"}
+    limiters = load_rate_limiters(client_id)
+    scheduler = DownloadScheduler()  # 재시도 일정은 참고만 하고 기록하지 않음
+    items, unresolved = [], []
+    try:
+        if is_tidal_playlist:
+            logger("[+] Tidal 플레이리스트에서 트랙 가져오는 중...")
+            tracks = get_tracks_from_tidal_playlist(playlist_url, headers, logger, limiters["search"], stop_flag)
+            playlist_id = re.search(r'playlist/([a-zA-Z0-9-]+)', playlist_url)
+            playlist_id = playlist_id.group(1) if playlist_id else ""
+            if delta_sync:
+                snapshot = load_playlist_snapshot("tidal", playlist_id)
+                added, _ = diff_playlist_snapshot(snapshot, [t['id'] for t in tracks])
+                tracks = [t for t in tracks if t['id'] in added]
+            # 이미 받은 트랙(출처 기록에 있고 파일이 남아 있는 곡)은 계획에서 제외
+            ledger = ProvenanceLedger(track_dir)
+            tracks = [t for t in tracks if not ledger.existing_files(t['id'])]
+            tracks, deferred = scheduler.order(tracks, _schedule_key, playlist_id, lambda t: t['duration'])
+            for t in tracks:
+                items.append({"id": t['id'], "url": t['url'], "title": t.get('title'), "artist": None,
+                              "duration": t.get('duration'), "source": _provenance_source(t, playlist_id),
+                              "schedule_key": _schedule_key(t)})
+        else:
+            logger("[+] 로컬 트랙 목록 불러오는 중...")
+            library = LocalLibrary(track_dir)
+            logger("[+] 유튜브 뮤직에서 트랙 가져오는 중...")
+            playlist_id = re.search(r'list=([a-zA-Z0-9_-]+)', playlist_url)
+            playlist_id = playlist_id.group(1) if playlist_id else ""
+            snapshot = load_playlist_snapshot("ytmusic", playlist_id) if delta_sync else {}
+            missing = []
+            for t in get_tracks_from_ytmusic(playlist_url, logger):
+                if stop_flag and stop_flag():
+                    logger("⚠️ 사용자 요청으로 계획 작성이 중단되었습니다.")
+                    return None
+                previous = snapshot.get(t.key)
+                if previous and previous.get("state") in RESOLVED_STATES:
+                    continue
+                if not library.match(t, 0.5, logger):
+                    missing.append(t)
+            library.save()
+            missing, deferred = scheduler.order(missing, _schedule_key, playlist_id, lambda t: t.duration)
+            logger(f"[+] 받을 곡 {len(missing)}개를 TIDAL에서 찾는 중...")
+
+            def resolve(indexed):
+                idx, t = indexed
+                if stop_flag and stop_flag():
+                    return None, None
+                result = {}
+                track_url = search_tidal_track(t.title, t.artist, headers, lambda msg: logger(f"[{idx:02d}] {msg}"),
+                                               limiters["search"], t.duration, result, stop_flag)
+                return track_url, result.get("reason")
+
+            resolved = _run_concurrently(list(enumerate(missing, 1)), resolve, [limiters["search"]])
+            if stop_flag and stop_flag():
+                logger("⚠️ 사용자 요청으로 계획 작성이 중단되었습니다.")
+                return None
+            for t, (track_url, reason) in zip(missing, resolved):
+                if not track_url:
+                    unresolved.append(dict(t.to_dict(), reason=reason))
+                    continue
+                items.append({"id": re.search(r'track/(\d+)', track_url).group(1), "url": track_url,
+                              "title": t.title, "artist": t.artist, "duration": t.duration,
+                              "source": _provenance_source(t, playlist_id), "schedule_key": _schedule_key(t)})
+
+        # TIDAL 쪽 재생 시간이 있으면 우선 사용 (후보 점수 계산 때 캐시된 값)
+        metadata = fetch_tidal_track_metadata([item["id"] for item in items], headers, logger, limiters["search"],
+                                              stop_flag)
+        for item in items:
+            duration = (metadata.get(str(item["id"])) or {}).get("duration") or item["duration"]
+            item["estimated_bytes"] = int((duration or PLAN_DEFAULT_DURATION) * LOSSLESS_BITRATE / 8)
+    finally:
+        save_rate_limiters(client_id, limiters)
+        save_tidal_metadata_cache()
+
+    total_bytes = sum(item["estimated_bytes"] for item in items)
+    throughput = limiters["download"].throughput or PLAN_DEFAULT_THROUGHPUT
+    tracks_path = os.path.join(track_dir, "Tracks")
+    free_bytes = shutil.disk_usage(tracks_path if os.path.exists(tracks_path) else track_dir).free
+    plan = {
+        "version": PLAN_VERSION,
+        "created": time.time(),
+        "playlist_url": playlist_url,
+        "is_tidal_playlist": is_tidal_playlist,
+        "playlist_id": playlist_id,
+        "track_dir": track_dir,
+        "items": items,
+        "unresolved": unresolved,
+        "deferred": len(deferred),
+        "estimate": {
+            "bytes": total_bytes,
+            "seconds": round(total_bytes / throughput),
+            "throughput": throughput,
+            "free_bytes": free_bytes,
+            "fits": total_bytes < free_bytes,
+        },
+    }
+    with open(plan_file, "w", encoding="utf-8") as f:
+        json.dump(plan, f, ensure_ascii=False, indent=2)
+
+    logger(f"\n[PLAN] 다운로드할 곡 {len(items)}개, TIDAL에서 찾지 못한 곡 {len(unresolved)}개, "
+           f"재시도 대기/보류 {len(deferred)}개")
+    logger(f"[PLAN] 예상 용량 {_format_bytes(total_bytes)}, 예상 시간 약 {max(1, round(plan['estimate']['seconds'] / 60))}분 "
+           f"(처리량 {_format_bytes(throughput)}/s" + ("" if limiters["download"].throughput else ", 기록 없음 - 기본값") + ")")
+    if plan["estimate"]["fits"]:
+        logger(f"[PLAN] 남은 디스크 공간 {_format_bytes(free_bytes)} ✅")
+    else:
+        logger(f"[PLAN] ❌ 디스크 공간 부족: 남은 공간 {_format_bytes(free_bytes)} < 예상 용량 {_format_bytes(total_bytes)}")
+    logger(f"계획이 {plan_file}에 저장되었습니다.")
+    return plan
+
+def _execute_plan(plan_file, track_dir, tidal_dl, headers, config_path, limiters, scheduler, logger,
+                  stop_flag=None, job_queue=None, ledger=None):
+    """plan_sync로 저장한 계획의 곡을 검색 없이 기록된 TIDAL 트랙으로 바로 다운로드"""
+    try:
+        with open(plan_file, "r", encoding="utf-8") as f:
+            plan = json.load(f)
+    except (OSError, ValueError) as e:
+        logger(f"❌ 계획 파일을 읽을 수 없습니다: {plan_file} - {e}")
+        return
+    if plan.get("version") != PLAN_VERSION:
+        logger(f"❌ 지원하지 않는 계획 파일 형식입니다: {plan_file}")
+        return
+    if os.path.abspath(plan.get("track_dir", "")) != os.path.abspath(track_dir):
+        logger(f"⚠️ 계획을 세운 폴더({plan.get('track_dir')})와 다운로드 폴더가 다릅니다.")
+    age = (time.time() - plan.get("created", 0)) / 3600
+    logger(f"[+] {age:.1f}시간 전에 저장한 계획 실행: {plan.get('playlist_url')}")
+
+    # 계획 이후 라이브러리에 생긴 곡은 제외
+    library = LocalLibrary(track_dir)
+    tracks = []
+    for item in plan.get("items", []):
+        source = item.get("source") or {}
+        if source.get("type") == "ytmusic" and library.match(
+                TrackRecord(None, item["title"], item["artist"]), 0.5, logger):
+            continue
+        title = f"{item['title']} - {item['artist']}" if item.get("artist") else item.get("title")
+        schedule_key = item.get("schedule_key")
+        if not schedule_key and source.get("type") == "ytmusic":
+            # schedule_key가 없던 이전 계획 파일은 원본 YouTube 항목에서 같은 키를 만듦
+            schedule_key = _schedule_key(TrackRecord(source.get("video_id"), source.get("title"), source.get("artist")))
+        tracks.append({"id": item["id"], "url": item["url"], "title": title, "duration": item.get("duration"),
+                       "source": source, "schedule_key": schedule_key or f"tidal:{item['id']}"})
+    library.save()
+    _profile_stage("download")
+    logger(f"\n[+] 총 {len(tracks)}곡 다운로드 시도 중... (이미 받은 곡 {len(plan.get('items', [])) - len(tracks)}개 제외)")
+    failed = try_download(tracks, tidal_dl, headers, track_dir, logger, stop_flag, config_path, limiters,
+                          scheduler, plan.get("playlist_id"), job_queue, ledger)
+    if stop_flag and stop_flag():
+        return
+    if failed:
+        logger(f"\n❌ {len(failed)}개 트랙 다운로드 실패")
+        with open("failed_tidal_tracks.json", "w", encoding="utf-8") as f:
+            json.dump(failed, f, ensure_ascii=False, indent=2)
+        logger("실패한 트랙 목록이 failed_tidal_tracks.json에 저장되었습니다.")
+    _verify_library(track_dir, tidal_dl, headers, config_path, limiters, ledger, logger, stop_flag)
+
+def run_downloader(track_dir, tidal_dl, playlist_url, client_id, client_secret, logger, is_tidal_playlist=False, stop_flag=None,
+                   delta_sync=False, report_removed=False, noise_tokens=None, pinned=False, shared_queue=False,
+                   plan_file=None, profile=None, profile_sample_thread=None):
+    global _active_profiler
+    if profile is None:
+        profile = os.getenv(PROFILE_ENV, "0").lower() in ("1", "true", "yes")
+    if not profile or _active_profiler:
+        _run_downloader(track_dir, tidal_dl, playlist_url, client_id, client_secret, logger, is_tidal_playlist,
+                        stop_flag, delta_sync, report_removed, noise_tokens, pinned, shared_queue, plan_file)
+        return
+
+    # 프로파일링 모드: 단계별 cProfile/tracemalloc 결과를 실행 보고서와 같은 위치에 저장
+    profiler = RunProfiler(sample_thread=profile_sample_thread)
+    profiler.start()
+    _active_profiler = profiler
+    logger(f"[+] 프로파일링 모드 - 결과 저장 위치: {profiler.out_dir}")
+    try:
+        _run_downloader(track_dir, tidal_dl, playlist_url, client_id, client_secret, logger, is_tidal_playlist,
+                        stop_flag, delta_sync, report_removed, noise_tokens, pinned, shared_queue, plan_file)
+    finally:
+        _active_profiler = None
+        profiler.stop()
+        summary = ", ".join(f"{stage['name']} {stage['seconds']:.1f}s" for stage in profiler.stages)
+        logger(f"[+] 프로파일 저장 완료: {profiler.out_dir} ({summary})")
+
+def _run_downloader(track_dir, tidal_dl, playlist_url, client_id, client_secret, logger, is_tidal_playlist=False,
+                    stop_flag=None, delta_sync=False, report_removed=False, noise_tokens=None, pinned=False,
+                    shared_queue=False, plan_file=None):
+    _profile_stage("token")
+    if noise_tokens is not None:
+        configure_normalizer(noise_tokens=noise_tokens)
     logger("[+] 액세스 토큰 요청 중...")
     access_token = get_tidal_access_token(client_id, client_secret, logger)
     if not access_token:
         return
 
+    _profile_stage("prepare")
     headers = {"Authorization": f"Bearer {access_token}"}
-    update_tidal_dl_config(tidal_dl, track_dir, logger)
+    config_path = update_tidal_dl_config(tidal_dl, track_dir, logger)
+    cleanup_stale_staging(track_dir, logger)
+
+    # 이전 실행에서 학습한 안전한 동시 실행 수/간격으로 시작
+    limiters = load_rate_limiters(client_id)
+    logger(f"[+] 동시 실행 수 - 검색: {limiters['search'].limit}, 다운로드: {limiters['download'].limit}")
+    scheduler = DownloadScheduler()
+    # 같은 컴퓨터에서 같은 트랙 디렉토리를 동기화하는 다른 프로세스와 작업을 나눠 처리
+    job_queue = None
+    if shared_queue:
+        try:
+            job_queue = JobQueue(os.path.join(track_dir, JOB_QUEUE_FILE_NAME))
+            logger(f"[+] 공유 작업 큐 사용 (작업자: {job_queue.worker_id})")
+        except ValueError as e:
+            logger(f"⚠️ {e} - 공유 작업 큐 없이 진행합니다.")
+    ledger = ProvenanceLedger(track_dir)
+    try:
+        if plan_file:
+            # 저장된 계획이 있으면 가져오기/매칭/검색을 다시 하지 않음
+            _execute_plan(plan_file, track_dir, tidal_dl, headers, config_path, limiters, scheduler, logger,
+                          stop_flag, job_queue, ledger)
+        else:
+            _sync_playlist(track_dir, tidal_dl, playlist_url, headers, config_path, limiters, scheduler,
+                           logger, is_tidal_playlist, stop_flag, delta_sync, report_removed, pinned, job_queue,
+                           ledger)
+    finally:
+        save_rate_limiters(client_id, limiters)
+        save_tidal_metadata_cache()
+        scheduler.save()
+        ledger.save()
+        if job_queue:
+            job_queue.close()
+
+def run_queue_worker(track_dir, tidal_dl, client_id, client_secret, logger, stop_flag=None):
+    """
+    플레이리스트를 읽지 않고 공유 작업 큐에 쌓인 작업만 처리하는 작업자로 실행합니다.
 
+    같은 컴퓨터의 다른 프로세스에서 run_downloader(shared_queue=True)가 넣은 작업을 나눠 받아 처리하며,
+    큐가 비면 종료합니다.
+    """
+    queue_path = os.path.join(track_dir, JOB_QUEUE_FILE_NAME)
+    if not os.path.exists(queue_path):
+        logger(f"❌ 공유 작업 큐가 없습니다: {queue_path}")
+        return
+    logger("[+] 액세스 토큰 요청 중...")
+    access_token = get_tidal_access_token(client_id, client_secret, logger)
+    if not access_token:
+        return
+
+    try:
+        job_queue = JobQueue(queue_path)
+    except ValueError as e:
+        logger(f"❌ {e}")
+        return
+    headers = {"Authorization": f"Bearer {access_token}"}
+    config_path = update_tidal_dl_config(tidal_dl, track_dir, logger)
+    limiters = load_rate_limiters(client_id)
+    scheduler = DownloadScheduler()
+    ledger = ProvenanceLedger(track_dir)
+    logger(f"[+] 공유 작업 큐 작업자로 실행 (작업자: {job_queue.worker_id})")
+    try:
+        _download_via_queue(job_queue, tidal_dl, headers, track_dir, logger, stop_flag, config_path,
+                            limiters, scheduler, ledger)
+    finally:
+        save_rate_limiters(client_id, limiters)
+        save_tidal_metadata_cache()
+        scheduler.save()
+        ledger.save()
+        job_queue.close()
+
+def _sync_playlist(track_dir, tidal_dl, playlist_url, headers, config_path, limiters, scheduler,
+                   logger, is_tidal_playlist=False, stop_flag=None, delta_sync=False, report_removed=False,
+                   pinned=False, job_queue=None, ledger=None):
     if is_tidal_playlist:
         # Tidal 플레이리스트 처리
+        _profile_stage("fetch")
         logger("[+] Tidal 플레이리스트에서 트랙 가져오는 중...")
-        tracks = get_tracks_from_tidal_playlist(playlist_url, headers, logger)
+        tracks = get_tracks_from_tidal_playlist(playlist_url, headers, logger, limiters["search"], stop_flag)
         
         if not tracks:
             return
             
+        playlist_id = re.search(r'playlist/([a-zA-Z0-9-]+)', playlist_url).group(1)
+        scheduler.pin(playlist_id, pinned)
+        snapshot = load_playlist_snapshot("tidal", playlist_id)
+        added, removed = diff_playlist_snapshot(snapshot, [t['id'] for t in tracks])
+        _report_removed_tracks(snapshot, removed, report_removed, logger)
+        entries = {k: v for k, v in snapshot.items() if k not in removed}
+        if delta_sync:
+            logger(f"[+] 변경분 동기화: 새로 추가되었거나 미완료된 곡 {len(added)}개 / 전체 {len(tracks)}개")
+            tracks = [t for t in tracks if t['id'] in added]
+        tracks, deferred = scheduler.order(tracks, _schedule_key, playlist_id, lambda t: t['duration'])
+        _log_deferred(deferred, scheduler, logger)
+            
+        _profile_stage("download")
         logger(f"\n[+] 총 {len(tracks)}곡 다운로드 시도 중...")
-        failed = []
-        
-        for idx, track in enumerate(tracks, 1):
-            # 중단 요청 확인
-            if stop_flag and stop_flag():
-                logger("⚠️ 사용자 요청으로 다운로드가 중단되었습니다.")
-                return
-                
-            logger(f"[{idx:02d}] 🎵 트랙 ID: {track['id']}")
-            if not download_with_tidal_dl(tidal_dl, track['url'], logger, stop_flag):
-                failed.append(track)
-            time.sleep(1)  # API 요청 간격 조절
+        failed = try_download(tracks, tidal_dl, headers, track_dir, logger, stop_flag, config_path, limiters,
+                              scheduler, playlist_id, job_queue, ledger)
+        stopped = bool(stop_flag and stop_flag())
+        failed_ids = {track['id'] for track in failed}
+        for track in tracks:
+            if track['id'] in failed_ids:
+                entries[track['id']] = {"state": "failed", "updated": time.time()}
+            elif not stopped:  # 중단된 경우 시도하지 않은 곡이 섞여 있으므로 기록하지 않음
+                entries[track['id']] = {"state": "downloaded", "updated": time.time()}
+        save_playlist_snapshot("tidal", playlist_id, entries)
+        if stopped:
+            return
             
         if failed:
             logger(f"\n❌ {len(failed)}개 트랙 다운로드 실패")
@@ -640,86 +3294,186 @@ def run_downloader(track_dir, tidal_dl, playlist_url, client_id, client_secret,
                 json.dump(failed, f, ensure_ascii=False, indent=2)
             logger("실패한 트랙 목록이 failed_tidal_tracks.json에 저장되었습니다.")
     else:
-        # YouTube Music 플레이리스트 처리
+        # YouTube Music 플레이리스트 처리 (플레이리스트는 페이지 단위로 가져오며 매칭과 함께 진행)
+        _profile_stage("fetch_match")
         logger("[+] 로컬 트랙 목록 불러오는 중...")
-        local_tracks = get_tracks_from_directory(track_dir)
+        library = LocalLibrary(track_dir)
         logger("[+] 유튜브 뮤직에서 트랙 가져오는 중...")
-        yt_tracks = get_tracks_from_ytmusic(playlist_url, logger)
+        fetch_status = {}
+        yt_tracks = get_tracks_from_ytmusic(playlist_url, logger, fetch_status)
+        playlist_id = re.search(r'list=([a-zA-Z0-9_-]+)', playlist_url)
+        playlist_id = playlist_id.group(1) if playlist_id else ""
+        scheduler.pin(playlist_id, pinned)
+        snapshot = load_playlist_snapshot("ytmusic", playlist_id)
+        entries = {}
+        
+        def mark(t, state):
+            entries[t.key] = {"state": state, "title": t.title, "artist": t.artist, "updated": time.time()}
 
         missing = []
+        known = 0
         for t in yt_tracks:
             # 중단 요청 확인
             if stop_flag and stop_flag():
                 logger("⚠️ 사용자 요청으로 다운로드가 중단되었습니다.")
                 return
                 
-            matched = False
+            # 변경분 동기화: 지난 실행에서 이미 해결된 곡은 매칭도 생략
+            previous = snapshot.get(t.key)
+            if delta_sync and previous and previous.get("state") in RESOLVED_STATES:
+                entries[t.key] = previous
+                known += 1
+                continue
+                
             logger(f"[CHECK] {t['title']} - {t['artist']}")
-            for p in t['patterns']:
-                for l in local_tracks:
-                    sim = similar(p, l)
-                    if DEBUG: logger(f"[DEBUG] comparing '{p}' vs '{l}' → {sim:.2f}")
-                    if sim > 0.5:
-                        if DEBUG: logger(f"[SIMILAR] {p} ≈ {l} → {sim:.2f}")
-                        matched = True
-                        break
-                if matched:
-                    break
-            if not matched:
+            if not library.match(t, 0.5, logger):
                 logger(f"[MISS] ❌ {t['title']} - {t['artist']}")
                 missing.append(t)
+                mark(t, "missing")
             else:
                 logger(f"[SKIP] ✅ {t['title']} - {t['artist']}")
+                mark(t, "local")
+
+        library.save()
+        logger(f"[+] 매칭: 이전 결과 재사용 {library.hits}곡, 유사도 비교 {library.comparisons}회 "
+               f"(라이브러리 세대 {library.generation})")
+        if delta_sync:
+            logger(f"[+] 변경분 동기화: 이전에 처리된 {known}곡 건너뜀, 새로 확인한 곡 {len(entries) - known}개")
+        # 플레이리스트를 끝까지 읽은 경우에만 삭제된 곡을 판단
+        if fetch_status.get("complete"):
+            _, removed = diff_playlist_snapshot(snapshot, entries.keys())
+            _report_removed_tracks(snapshot, removed, report_removed, logger)
+        else:
+            entries = {**snapshot, **entries}
 
+        # 재시도 시각이 되지 않았거나 TIDAL에 없어 보류된 곡은 이번 실행에서 제외 (missing 상태 유지)
+        missing, deferred = scheduler.order(missing, _schedule_key, playlist_id, lambda t: t.duration)
+        _log_deferred(deferred, scheduler, logger)
+        _profile_stage("download")
         logger(f"\n[+] 총 {len(missing)}곡 다운로드 시도 중...")
-        failed = try_download(missing, tidal_dl, headers, track_dir, logger, stop_flag)
-
-        if failed and not (stop_flag and stop_flag()):  # 중단되지 않은 경우에만 재시도
-            logger("\n[+] 다운로드 실패 곡 diff 기반 재시도 중...")
-            local_tracks_retry = get_tracks_from_directory(track_dir)
-            recheck = []
-            for t in failed:
-                # 중단 요청 확인
-                if stop_flag and stop_flag():
-                    logger("⚠️ 사용자 요청으로 다운로드가 중단되었습니다.")
-                    return
-                    
-                matched = False
-                for pattern in t['patterns']:
-                    for l in local_tracks_retry:
-                        sim = similar(pattern, l)
-                        if DEBUG:
-                            logger(f"[DEBUG] retry comparing '{pattern}' vs '{l}' → {sim:.2f}")
-                        if sim > 0.2:
-                            matched = True
-                            logger(f"[RETRY SKIP] ✅ {t['title']} - {t['artist']} ≈ {l} → {sim:.2f}")
-                            break
-                    if matched:
-                        break
-                if not matched:
-                    recheck.append(t)
+        failed = try_download(missing, tidal_dl, headers, track_dir, logger, stop_flag, config_path, limiters,
+                              scheduler, playlist_id, job_queue, ledger)
+        stopped = bool(stop_flag and stop_flag())
+        failed_keys = {t.key for t in failed}
+        for t in missing:
+            if t.key in failed_keys:
+                mark(t, "failed")
+            elif not stopped:  # 중단된 경우 시도하지 않은 곡이 섞여 있으므로 missing으로 유지
+                mark(t, "downloaded")
 
-            if recheck:
-                logger(f"\n[+] 재시도할 {len(recheck)}곡 다운로드 중...")
-                still_failed = try_download(recheck, tidal_dl, headers, track_dir, logger, stop_flag)
+        try:
+            if failed and not stopped:  # 중단되지 않은 경우에만 재시도
+                _profile_stage("retry")
+                logger("\n[+] 다운로드 실패 곡 diff 기반 재시도 중...")
+                library.refresh()  # 이번 실행에서 받은 파일 반영 (새 파일하고만 다시 비교)
+                recheck = []
+                for t in failed:
+                    # 중단 요청 확인
+                    if stop_flag and stop_flag():
+                        logger("⚠️ 사용자 요청으로 다운로드가 중단되었습니다.")
+                        return
+                        
+                    match = library.match(t, 0.2, logger)
+                    if not match:
+                        recheck.append(t)
+                    else:
+                        logger(f"[RETRY SKIP] ✅ {t['title']} - {t['artist']} ≈ {match[0]} → {match[1]:.2f}")
+                        mark(t, "local")
+
+                # 요청 제한이나 TIDAL에 없는 곡은 바로 재시도하지 않고 다음 실행의 백오프 일정에 맡김
+                recheck, deferred = scheduler.order(recheck, _schedule_key, playlist_id, lambda t: t.duration)
+                if deferred:
+                    logger(f"[+] 백오프/보류 대상 {len(deferred)}곡은 다음 실행에서 재시도합니다.")
+
+                if recheck:
+                    logger(f"\n[+] 재시도할 {len(recheck)}곡 다운로드 중...")
+                    still_failed = try_download(recheck, tidal_dl, headers, track_dir, logger, stop_flag, config_path,
+                                                limiters, scheduler, playlist_id, job_queue, ledger)
+                    still_failed_keys = {t.key for t in still_failed}
+                    for t in recheck:
+                        if t.key not in still_failed_keys and not (stop_flag and stop_flag()):
+                            mark(t, "downloaded")
+
+                    still_failed = still_failed + deferred
+                elif deferred:
+                    still_failed = deferred
+                else:
+                    still_failed = []
+                    logger("✅ 모든 실패 곡이 재시도에서 성공했습니다.")
 
                 if still_failed:
                     with open("missing_tracks.json", "w", encoding="utf-8") as f:
-                        json.dump(still_failed, f, ensure_ascii=False, indent=2)
+                        json.dump([dict(t.to_dict(), reason=scheduler.entry(_schedule_key(t)).get("reason"))
+                                   for t in still_failed], f, ensure_ascii=False, indent=2)
                     logger(f"❌ 최종 실패 트랙 {len(still_failed)}개 → missing_tracks.json 저장 완료")
             else:
-                logger("✅ 모든 실패 곡이 재시도에서 성공했습니다.")
-        else:
-            logger("✅ 모든 곡 다운로드 완료!")
-    
-    # 중단되지 않은 경우에만 파일 무결성 검사 실행
-    if not (stop_flag and stop_flag()):
-        # 다운로드 완료 후 파일 무결성 검사
-        logger("\n[+] 다운로드된 파일 무결성 검사 시작...")
-        corrupted_files = verify_downloaded_files(track_dir, logger)
-        
-        if corrupted_files:
-            logger(f"\n⚠️ {len(corrupted_files)}개의 손상된 파일이 발견되었습니다.")
-            retry_corrupted_downloads(corrupted_files, tidal_dl, headers, track_dir, logger)
-        else:
-            logger("\n✅ 모든 파일이 정상적으로 다운로드되었습니다!")
\ No newline at end of file
+                logger("✅ 모든 곡 다운로드 완료!")
+        finally:
+            save_playlist_snapshot("ytmusic", playlist_id, entries)
+            library.save()
+
+
+    _verify_library(track_dir, tidal_dl, headers, config_path, limiters, ledger, logger, stop_flag)
+
+def main(argv=None):
+    """
+    명령줄 실행 - 같은 컴퓨터의 여러 프로세스가 공유 작업 큐로 같은 라이브러리를 동기화하거나
+    중복 곡을 검사할 때 사용합니다.
+
+    값을 주지 않은 옵션은 GUI와 같은 ~/.tidal_downloader.env 설정을 사용합니다.
+    """
+    import argparse
+    from dotenv import load_dotenv
+
+    load_dotenv(os.path.join(os.path.expanduser("~"), ".tidal_downloader.env"))
+    # 모듈 로드 시점에는 .env가 아직 적용되지 않았으므로 GUI와 같은 정규화 설정을 다시 적용
+    # (설정이 다르면 정규화 식별자가 달라져 매칭 기록을 매번 버리게 됨)
+    configure_normalizer(noise_tokens=os.getenv("NOISE_TOKENS", ",".join(DEFAULT_NOISE_TOKENS)).split(","),
+                         transliterate=os.getenv("TRANSLITERATE", "0") == "1")
+    parser = argparse.ArgumentParser(description="YouTube Music / TIDAL 플레이리스트를 tidal-dl-ng로 동기화")
+    parser.add_argument("--tracks-dir", default=os.getenv("TRACKS_DIR"), help="다운로드 폴더")
+    parser.add_argument("--tidal-dl", default=os.getenv("TIDAL_DL", "tidal-dl-ng"),
+                        help="tidal-dl-ng 명령 또는 실행 파일 경로")
+    parser.add_argument("--playlist", help="플레이리스트 URL (기본값: 저장된 YouTube 또는 --tidal이면 TIDAL 플레이리스트)")
+    parser.add_argument("--client-id", default=os.getenv("CLIENT_ID"))
+    parser.add_argument("--client-secret", default=os.getenv("CLIENT_SECRET"))
+    parser.add_argument("--tidal", action="store_true", help="TIDAL 플레이리스트로 처리")
+    parser.add_argument("--delta", action="store_true", help="변경분만 동기화")
+    parser.add_argument("--pin", action="store_true", help="이 재생목록 우선 처리")
+    parser.add_argument("--shared-queue", action="store_true", help="공유 작업 큐로 다른 작업자와 나눠 처리")
+    parser.add_argument("--worker", action="store_true", help="플레이리스트 없이 공유 작업 큐의 작업만 처리")
+    parser.add_argument("--plan", nargs="?", const=PLAN_FILE, metavar="PLAN_FILE",
+                        help=f"다운로드 없이 계획만 저장 (기본값: {PLAN_FILE})")
+    parser.add_argument("--execute-plan", nargs="?", const=PLAN_FILE, metavar="PLAN_FILE",
+                        help="저장된 계획을 검색 없이 바로 실행")
+    parser.add_argument("--profile", action="store_true", default=None,
+                        help=f"단계별 cProfile/tracemalloc 결과를 profile_<시각>/에 저장 ({PROFILE_ENV}=1과 같음)")
+    parser.add_argument("--dedup", choices=DEDUP_ACTIONS,
+                        help="다운로드 없이 Tracks 폴더의 중복 곡만 검사 (report/hardlink/remove)")
+    args = parser.parse_args(argv)
+
+    logger = lambda msg: print(msg, flush=True)
+    if args.dedup:
+        if not args.tracks_dir:
+            parser.error("--tracks-dir 값이 필요합니다")
+        find_duplicate_tracks(args.tracks_dir, logger, args.dedup)
+        return
+    if not (args.tracks_dir and args.tidal_dl and args.client_id and args.client_secret):
+        parser.error("--tracks-dir, --tidal-dl, --client-id, --client-secret 값이 필요합니다")
+    if args.worker:
+        run_queue_worker(args.tracks_dir, args.tidal_dl, args.client_id, args.client_secret, logger)
+        return
+    playlist_url = args.playlist or os.getenv("TIDAL_PLAYLIST_URL" if args.tidal else "YT_PLAYLIST_URL")
+    if not playlist_url and not args.execute_plan:
+        parser.error("--playlist 값이 필요합니다")
+    if args.plan:
+        plan_sync(args.tracks_dir, playlist_url, args.client_id, args.client_secret, logger,
+                  is_tidal_playlist=args.tidal, delta_sync=args.delta, plan_file=args.plan)
+        return
+    run_downloader(args.tracks_dir, args.tidal_dl, playlist_url, args.client_id, args.client_secret, logger,
+                   is_tidal_playlist=args.tidal, delta_sync=args.delta,
+                   pinned=args.pin, shared_queue=args.shared_queue, plan_file=args.execute_plan,
+                   profile=args.profile)
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,17 @@
 import sys
 import os
+import json
+import tempfile
 from pathlib import Path
-from dotenv import load_dotenv, set_key
+from dotenv import load_dotenv, dotenv_values
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QTextEdit, QLineEdit, QLabel, QFileDialog, QRadioButton, QButtonGroup,
-    QMessageBox
+    QMessageBox, QCheckBox, QComboBox, QInputDialog
 )
 from PyQt5.QtCore import Qt, pyqtSignal, QTranslator, QLibraryInfo
 import builtins
+import threading
 
 # gettext 함수를 재정의하여 번역 문제 해결
 original_gettext = builtins.__dict__.get('_', lambda x: x)
@@ -28,17 +31,164 @@ if os.path.exists(".env") and not os.path.exists(ENV_FILE):
 
 load_dotenv(ENV_FILE)
 
+# 이름 있는 프로필(재생목록 묶음, 인증 정보 등) 저장 위치
+PROFILES_FILE = os.path.join(os.path.expanduser("~"), ".tidal_downloader_profiles.json")
+DEFAULT_PROFILE = "기본"
+SETTINGS_SAVE_DELAY = 0.5  # 마지막 변경 후 이 시간 동안 추가 변경이 없으면 저장 (초)
+# 프로필마다 따로 기억하는 설정
+PROFILE_KEYS = (
+    "TRACKS_DIR", "TIDAL_DL", "YT_PLAYLIST_URL", "TIDAL_PLAYLIST_URL", "CLIENT_ID", "CLIENT_SECRET",
+    "NOISE_TOKENS", "DELTA_SYNC", "REPORT_REMOVED", "PIN_PLAYLIST", "SHARED_QUEUE", "USE_PLAN", "PROFILE",
+)
+# 프로필에 없는 설정의 기본값 (나머지 입력 필드는 빈 문자열)
+PROFILE_DEFAULTS = {
+    "TIDAL_DL": "tidal-dl-ng", "NOISE_TOKENS": "ukf drum and bass",
+    "DELTA_SYNC": "0", "REPORT_REMOVED": "0", "PIN_PLAYLIST": "0", "SHARED_QUEUE": "0", "USE_PLAN": "0", "PROFILE": "0",
+}
+
+def _write_text_atomic(path, text):
+    """같은 디렉토리의 임시 파일(권한 600)에 기록한 뒤 교체"""
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _quote_env_value(value):
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+class SettingsStore:
+    """
+    GUI 설정 저장소.
+
+    설정은 메모리에 두고 즉시 반영하며, 파일 쓰기는 마지막 변경 후 SETTINGS_SAVE_DELAY 동안 모아
+    백그라운드 스레드에서 원자적으로 교체합니다. 입력할 때마다 UI 스레드에서 .env 파일을 다시 쓰지 않습니다.
+    활성 설정은 명령줄 실행과 공유하도록 ENV_FILE에, 프로필 목록은 PROFILES_FILE에 저장합니다.
+    """
+
+    def __init__(self, env_file=ENV_FILE, profiles_file=PROFILES_FILE, delay=SETTINGS_SAVE_DELAY):
+        self.env_file = env_file
+        self.profiles_file = profiles_file
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+        self.values = {k: v for k, v in dotenv_values(env_file).items() if v is not None} \
+            if os.path.exists(env_file) else {}
+        try:
+            with open(profiles_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.profiles = data["profiles"]
+            self.active = data["active"] if data["active"] in self.profiles else next(iter(self.profiles))
+        except Exception:
+            # 처음 실행 시 현재 설정으로 기본 프로필 생성
+            self.active = DEFAULT_PROFILE
+            self.profiles = {DEFAULT_PROFILE: {k: self.values[k] for k in PROFILE_KEYS if k in self.values}}
+
+    def get(self, key, default=""):
+        with self._lock:
+            return self.values.get(key, default)
+
+    def set(self, key, value):
+        with self._lock:
+            if self.values.get(key) == value:
+                return
+            self.values[key] = value
+            if key in PROFILE_KEYS:
+                self.profiles[self.active][key] = value
+        self._schedule()
+
+    def _schedule(self):
+        with self._lock:
+            self._dirty = True
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """변경된 설정을 바로 저장 (프로그램 종료 시에도 호출)"""
+        with self._write_lock:
+            with self._lock:
+                if self._timer:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                env_text = "".join(f"{k}={_quote_env_value(v)}\n" for k, v in self.values.items())
+                profiles_text = json.dumps({"active": self.active, "profiles": self.profiles},
+                                           ensure_ascii=False, indent=2)
+            try:
+                _write_text_atomic(self.env_file, env_text)
+                _write_text_atomic(self.profiles_file, profiles_text)
+            except Exception as e:
+                # 자동 저장 중 에러는 콘솔에만 출력 (UI에는 표시하지 않음)
+                print(f"설정 저장 중 오류: {e}")
+                with self._lock:
+                    self._dirty = True
+
+    def profile_names(self):
+        with self._lock:
+            return list(self.profiles)
+
+    def switch_profile(self, name):
+        """
+        활성 프로필을 바꾸고 그 프로필의 설정을 반환.
+
+        프로필에 없는 설정은 이전 프로필 값을 남기지 않고 기본값으로 되돌립니다.
+        """
+        with self._lock:
+            self.active = name
+            profile = self.profiles[name]
+            values = {k: profile.get(k, PROFILE_DEFAULTS.get(k, "")) for k in PROFILE_KEYS}
+            self.values.update(values)
+        self._schedule()
+        return values
+
+    def save_profile_as(self, name):
+        """현재 설정을 새 프로필로 저장하고 활성화"""
+        with self._lock:
+            self.profiles[name] = {k: self.values[k] for k in PROFILE_KEYS if k in self.values}
+            self.active = name
+        self._schedule()
+
+    def delete_profile(self, name):
+        """
+        프로필을 삭제합니다. 활성 프로필을 삭제하면 남은 첫 번째 프로필로 전환합니다.
+
+        Returns:
+            dict | None: 삭제 후 활성 프로필의 설정. 마지막 프로필이면 삭제하지 않고 None
+        """
+        with self._lock:
+            if len(self.profiles) <= 1:
+                return None
+            del self.profiles[name]
+            active = next(iter(self.profiles)) if self.active == name else self.active
+        # 삭제한 프로필의 값(인증 정보 등)이 설정에 남지 않도록 항상 활성 프로필 값으로 다시 채움
+        return self.switch_profile(active)
+
 class DownloaderApp(QWidget):
     log_signal = pyqtSignal(str)  # UI thread-safe logging
 
     def __init__(self):
         super().__init__()
+        self.settings = SettingsStore()
         self.init_ui()
         self.setWindowTitle("TIDAL Auto Downloader")
         self.setMinimumSize(800, 600)
         self.is_processing = False
         self.log_signal.connect(self.append_log)
         self.auto_save_enabled = True  # 자동 저장 활성화 플래그
+        self.main_thread_id = threading.get_ident()  # 프로파일링 시 샘플링할 Qt 메인 스레드
         
         # 시작 시 로딩 메시지 표시
         self.log("프로그램이 시작되었습니다. 다운로드를 시작하려면 'Start Download'를 클릭하세요.")
@@ -48,8 +198,21 @@ class DownloaderApp(QWidget):
 
         # 상단 입력 폼
         form_layout = QVBoxLayout()
-        self.track_dir_input = self.create_input(form_layout, "Tracks Directory", os.getenv("TRACKS_DIR", ""))
-        self.tidal_dl_input = self.create_input(form_layout, "TIDAL DL Command", os.getenv("TIDAL_DL", "tidal-dl-ng"))
+
+        # 프로필 선택
+        profile_layout = QHBoxLayout()
+        profile_layout.addWidget(QLabel("프로필"))
+        self.profile_combo = QComboBox()
+        self.profile_combo.addItems(self.settings.profile_names())
+        self.profile_combo.setCurrentText(self.settings.active)
+        self.save_profile_btn = QPushButton("새 프로필로 저장")
+        self.delete_profile_btn = QPushButton("프로필 삭제")
+        profile_layout.addWidget(self.profile_combo, 1)
+        profile_layout.addWidget(self.save_profile_btn)
+        profile_layout.addWidget(self.delete_profile_btn)
+        form_layout.addLayout(profile_layout)
+        self.track_dir_input = self.create_input(form_layout, "Tracks Directory", self.settings.get("TRACKS_DIR", ""))
+        self.tidal_dl_input = self.create_input(form_layout, "TIDAL DL Command", self.settings.get("TIDAL_DL", "tidal-dl-ng"))
         
         # 플레이리스트 선택 라디오 버튼
         playlist_type_layout = QHBoxLayout()
@@ -72,7 +235,7 @@ class DownloaderApp(QWidget):
         self.youtube_playlist_layout = QHBoxLayout()
         self.youtube_playlist_layout.addWidget(QLabel("YouTube Playlist URL"))
         self.playlist_url_input = QLineEdit()
-        self.playlist_url_input.setText(os.getenv("YT_PLAYLIST_URL", ""))
+        self.playlist_url_input.setText(self.settings.get("YT_PLAYLIST_URL", ""))
         self.youtube_playlist_layout.addWidget(self.playlist_url_input)
         form_layout.addLayout(self.youtube_playlist_layout)
         
@@ -80,12 +243,36 @@ class DownloaderApp(QWidget):
         self.tidal_playlist_layout = QHBoxLayout()
         self.tidal_playlist_layout.addWidget(QLabel("TIDAL Playlist URL"))
         self.tidal_playlist_input = QLineEdit()
-        self.tidal_playlist_input.setText(os.getenv("TIDAL_PLAYLIST_URL", ""))
+        self.tidal_playlist_input.setText(self.settings.get("TIDAL_PLAYLIST_URL", ""))
         self.tidal_playlist_layout.addWidget(self.tidal_playlist_input)
         form_layout.addLayout(self.tidal_playlist_layout)
         
-        self.client_id_input = self.create_input(form_layout, "Client ID", os.getenv("CLIENT_ID", ""))
-        self.client_secret_input = self.create_input(form_layout, "Client Secret", os.getenv("CLIENT_SECRET", ""))
+        self.client_id_input = self.create_input(form_layout, "Client ID", self.settings.get("CLIENT_ID", ""))
+        self.client_secret_input = self.create_input(form_layout, "Client Secret", self.settings.get("CLIENT_SECRET", ""))
+        self.noise_tokens_input = self.create_input(form_layout, "Noise Tokens (쉼표 구분)", self.settings.get("NOISE_TOKENS", "ukf drum and bass"))
+
+        # 동기화 옵션
+        sync_option_layout = QHBoxLayout()
+        self.delta_sync_check = QCheckBox("변경분만 동기화 (지난 실행 이후 추가된 곡)")
+        self.delta_sync_check.setChecked(self.settings.get("DELTA_SYNC", "0") == "1")
+        self.report_removed_check = QCheckBox("삭제된 곡 보고")
+        self.report_removed_check.setChecked(self.settings.get("REPORT_REMOVED", "0") == "1")
+        self.pinned_check = QCheckBox("이 재생목록 우선 처리")
+        self.pinned_check.setChecked(self.settings.get("PIN_PLAYLIST", "0") == "1")
+        self.shared_queue_check = QCheckBox("공유 작업 큐 (같은 PC의 여러 프로세스가 나눠 받기)")
+        self.shared_queue_check.setChecked(self.settings.get("SHARED_QUEUE", "0") == "1")
+        self.use_plan_check = QCheckBox("저장된 계획으로 실행")
+        self.use_plan_check.setChecked(self.settings.get("USE_PLAN", "0") == "1")
+        self.profile_check = QCheckBox("프로파일링 (성능 기록)")
+        self.profile_check.setChecked(self.settings.get("PROFILE", "0") == "1")
+        sync_option_layout.addWidget(self.delta_sync_check)
+        sync_option_layout.addWidget(self.report_removed_check)
+        sync_option_layout.addWidget(self.pinned_check)
+        sync_option_layout.addWidget(self.shared_queue_check)
+        sync_option_layout.addWidget(self.use_plan_check)
+        sync_option_layout.addWidget(self.profile_check)
+        sync_option_layout.addStretch()
+        form_layout.addLayout(sync_option_layout)
 
         # 라디오 버튼 상태에 따라 입력 필드 활성화/비활성화
         self.youtube_radio.toggled.connect(self.update_playlist_inputs)
@@ -99,6 +286,35 @@ class DownloaderApp(QWidget):
         self.tidal_playlist_input.textChanged.connect(lambda: self.save_setting("TIDAL_PLAYLIST_URL", self.tidal_playlist_input.text()))
         self.client_id_input.textChanged.connect(lambda: self.save_setting("CLIENT_ID", self.client_id_input.text()))
         self.client_secret_input.textChanged.connect(lambda: self.save_setting("CLIENT_SECRET", self.client_secret_input.text()))
+        self.noise_tokens_input.textChanged.connect(lambda: self.save_setting("NOISE_TOKENS", self.noise_tokens_input.text()))
+        self.delta_sync_check.toggled.connect(lambda checked: self.save_setting("DELTA_SYNC", "1" if checked else "0"))
+        self.report_removed_check.toggled.connect(lambda checked: self.save_setting("REPORT_REMOVED", "1" if checked else "0"))
+        self.pinned_check.toggled.connect(lambda checked: self.save_setting("PIN_PLAYLIST", "1" if checked else "0"))
+        self.shared_queue_check.toggled.connect(lambda checked: self.save_setting("SHARED_QUEUE", "1" if checked else "0"))
+        self.use_plan_check.toggled.connect(lambda checked: self.save_setting("USE_PLAN", "1" if checked else "0"))
+        self.profile_check.toggled.connect(lambda checked: self.save_setting("PROFILE", "1" if checked else "0"))
+
+        # 프로필 전환 시 값을 채울 입력 필드
+        self.setting_inputs = {
+            "TRACKS_DIR": self.track_dir_input,
+            "TIDAL_DL": self.tidal_dl_input,
+            "YT_PLAYLIST_URL": self.playlist_url_input,
+            "TIDAL_PLAYLIST_URL": self.tidal_playlist_input,
+            "CLIENT_ID": self.client_id_input,
+            "CLIENT_SECRET": self.client_secret_input,
+            "NOISE_TOKENS": self.noise_tokens_input,
+        }
+        self.setting_checks = {
+            "DELTA_SYNC": self.delta_sync_check,
+            "REPORT_REMOVED": self.report_removed_check,
+            "PIN_PLAYLIST": self.pinned_check,
+            "SHARED_QUEUE": self.shared_queue_check,
+            "USE_PLAN": self.use_plan_check,
+            "PROFILE": self.profile_check,
+        }
+        self.profile_combo.activated[str].connect(self.on_profile_selected)
+        self.save_profile_btn.clicked.connect(self.on_save_profile)
+        self.delete_profile_btn.clicked.connect(self.on_delete_profile)
 
         layout.addLayout(form_layout)
 
@@ -106,11 +322,20 @@ class DownloaderApp(QWidget):
         button_layout = QHBoxLayout()
         self.start_btn = QPushButton("Start Download")
         self.stop_btn = QPushButton("Stop Download")
+        self.plan_btn = QPushButton("계획 세우기 (Dry Run)")
         self.stop_btn.setEnabled(False)  # 초기에는 비활성화
         self.clear_btn = QPushButton("Clear Log")
+        self.dedup_btn = QPushButton("중복 곡 검사")
+        self.dedup_action_combo = QComboBox()
+        self.dedup_action_combo.addItem("보고만", "report")
+        self.dedup_action_combo.addItem("하드 링크로 합치기", "hardlink")
+        self.dedup_action_combo.addItem("중복 삭제", "remove")
         button_layout.addWidget(self.start_btn)
         button_layout.addWidget(self.stop_btn)
+        button_layout.addWidget(self.plan_btn)
         button_layout.addWidget(self.clear_btn)
+        button_layout.addWidget(self.dedup_btn)
+        button_layout.addWidget(self.dedup_action_combo)
         layout.addLayout(button_layout)
 
         # 로그 출력 텍스트 영역
@@ -121,9 +346,11 @@ class DownloaderApp(QWidget):
         self.setLayout(layout)
 
         # 이벤트 연결
-        self.start_btn.clicked.connect(self.on_start)
+        self.start_btn.clicked.connect(lambda: self.on_start())
         self.stop_btn.clicked.connect(self.on_stop)
         self.clear_btn.clicked.connect(lambda: self.log_area.clear())
+        self.dedup_btn.clicked.connect(self.on_dedup)
+        self.plan_btn.clicked.connect(lambda: self.on_start(dry_run=True))
         
         # 다운로드 중단 플래그
         self.stop_requested = False
@@ -153,9 +380,22 @@ class DownloaderApp(QWidget):
             self.tidal_playlist_input,
             self.client_id_input,
             self.client_secret_input,
+            self.noise_tokens_input,
             self.start_btn,
             self.youtube_radio,
-            self.tidal_radio
+            self.tidal_radio,
+            self.delta_sync_check,
+            self.report_removed_check,
+            self.pinned_check,
+            self.shared_queue_check,
+            self.use_plan_check,
+            self.profile_check,
+            self.profile_combo,
+            self.save_profile_btn,
+            self.delete_profile_btn,
+            self.plan_btn,
+            self.dedup_btn,
+            self.dedup_action_combo
         ]:
             widget.setEnabled(not lock)
             
@@ -174,11 +414,57 @@ class DownloaderApp(QWidget):
         if not self.auto_save_enabled:
             return
             
-        try:
-            set_key(ENV_FILE, key, value)
-        except Exception as e:
-            # 자동 저장 중 에러는 콘솔에만 출력 (UI에는 표시하지 않음)
-            print(f"설정 저장 중 오류: {e}")
+        # 메모리에 바로 반영하고 파일 쓰기는 백그라운드에서 모아서 처리
+        self.settings.set(key, value)
+
+    def on_profile_selected(self, name):
+        """선택한 프로필의 설정으로 입력 필드 채우기"""
+        if name == self.settings.active:
+            return
+        self.apply_profile_values(self.settings.switch_profile(name))
+        self.log(f"[+] 프로필 전환: {name}")
+
+    def apply_profile_values(self, values):
+        for key, widget in self.setting_inputs.items():
+            widget.setText(values[key])
+        for key, widget in self.setting_checks.items():
+            widget.setChecked(values[key] == "1")
+
+    def on_save_profile(self):
+        name, ok = QInputDialog.getText(self, "새 프로필로 저장", "프로필 이름:")
+        name = name.strip()
+        if not ok or not name:
+            return
+        self.settings.save_profile_as(name)
+        if self.profile_combo.findText(name) < 0:
+            self.profile_combo.addItem(name)
+        self.profile_combo.setCurrentText(name)
+        self.log(f"[+] 현재 설정을 프로필 '{name}'(으)로 저장했습니다.")
+
+    def on_delete_profile(self):
+        name = self.profile_combo.currentText()
+        reply = QMessageBox.question(
+            self,
+            '프로필 삭제',
+            f"프로필 '{name}'을(를) 삭제하시겠습니까?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+        values = self.settings.delete_profile(name)
+        if values is None:
+            self.log("⚠️ 마지막 프로필은 삭제할 수 없습니다.")
+            return
+        self.profile_combo.removeItem(self.profile_combo.findText(name))
+        self.profile_combo.setCurrentText(self.settings.active)
+        self.apply_profile_values(values)
+        self.log(f"[+] 프로필 '{name}' 삭제 - 현재 프로필: {self.settings.active}")
+
+    def closeEvent(self, event):
+        # 아직 저장되지 않은 설정을 종료 전에 저장
+        self.settings.flush()
+        super().closeEvent(event)
 
     def update_playlist_inputs(self):
         """라디오 버튼 상태에 따라 입력 필드 활성화/비활성화"""
@@ -193,7 +479,7 @@ class DownloaderApp(QWidget):
         self.playlist_url_input.setEnabled(is_youtube)
         self.tidal_playlist_input.setEnabled(not is_youtube)
 
-    def on_start(self):
+    def on_start(self, dry_run=False):
         if self.is_processing:
             return
         
@@ -205,8 +491,11 @@ class DownloaderApp(QWidget):
             self.log("❌ TIDAL Client ID와 Secret을 입력하세요.")
             return
             
-        # 플레이리스트 URL 검사
-        if self.youtube_radio.isChecked():
+        # 플레이리스트 URL 검사 (저장된 계획으로 실행하는 경우 계획의 플레이리스트 사용)
+        use_plan = self.use_plan_check.isChecked() and not dry_run
+        if use_plan:
+            self.log("[+] 저장된 계획으로 실행합니다.")
+        elif self.youtube_radio.isChecked():
             if not self.playlist_url_input.text() or "list=" not in self.playlist_url_input.text():
                 self.log("❌ 유효한 YouTube 플레이리스트 URL을 입력하세요.")
                 return
@@ -236,8 +525,7 @@ class DownloaderApp(QWidget):
         self.log("[+] 필요한 모듈 로딩 중... (이 작업은 처음 실행 시 시간이 걸릴 수 있습니다)")
         
         # 별도 스레드에서 실행
-        import threading
-        threading.Thread(target=self.run_process, daemon=True).start()
+        threading.Thread(target=self.run_process, args=(dry_run, use_plan), daemon=True).start()
 
     def on_stop(self):
         """다운로드 중단 처리"""
@@ -254,9 +542,48 @@ class DownloaderApp(QWidget):
             self.log("⚠️ 다운로드 중단 요청됨... 현재 작업이 완료되면 중단됩니다.")
             self.stop_btn.setEnabled(False)
 
-    def run_process(self):
+    def on_dedup(self):
+        """Tracks 폴더의 중복 곡 검사"""
+        if self.is_processing:
+            return
+        if not self.track_dir_input.text():
+            self.log("❌ Tracks Directory를 입력하세요.")
+            return
+        action = self.dedup_action_combo.currentData()
+        if action != "report":
+            reply = QMessageBox.question(
+                self,
+                '중복 곡 정리',
+                f"중복 파일을 '{self.dedup_action_combo.currentText()}' 방식으로 정리하시겠습니까?",
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                return
+
+        self.lock_ui(True)
+        self.is_processing = True
+        threading.Thread(target=self.run_dedup, args=(action,), daemon=True).start()
+
+    def run_dedup(self, action):
+        try:
+            from tidal_downloader_core import find_duplicate_tracks
+
+            self.stop_requested = False
+            find_duplicate_tracks(self.track_dir_input.text(), self.log, action,
+                                  stop_flag=lambda: self.stop_requested)
+        except Exception as e:
+            self.log(f"❌ 중복 검사 중 오류 발생: {e}")
+            import traceback
+            self.log(traceback.format_exc())
+        finally:
+            self.is_processing = False
+            self.lock_ui(False)
+            self.stop_requested = False
+
+    def run_process(self, dry_run=False, use_plan=False):
         try:
-            from tidal_downloader_core import run_downloader
+            from tidal_downloader_core import run_downloader, plan_sync, configure_normalizer, PLAN_FILE
             
             # 중단 플래그 초기화
             self.stop_requested = False
@@ -264,6 +591,20 @@ class DownloaderApp(QWidget):
             # 플레이리스트 URL 선택
             playlist_url = self.playlist_url_input.text() if self.youtube_radio.isChecked() else self.tidal_playlist_input.text()
             is_tidal_playlist = not self.youtube_radio.isChecked()
+
+            if dry_run:
+                configure_normalizer(noise_tokens=self.noise_tokens_input.text().split(","))
+                plan_sync(
+                    track_dir=self.track_dir_input.text(),
+                    playlist_url=playlist_url,
+                    client_id=self.client_id_input.text(),
+                    client_secret=self.client_secret_input.text(),
+                    logger=self.log,
+                    is_tidal_playlist=is_tidal_playlist,
+                    stop_flag=lambda: self.stop_requested,
+                    delta_sync=self.delta_sync_check.isChecked()
+                )
+                return
             
             run_downloader(
                 track_dir=self.track_dir_input.text(),
@@ -273,7 +614,16 @@ class DownloaderApp(QWidget):
                 client_secret=self.client_secret_input.text(),
                 logger=self.log,
                 is_tidal_playlist=is_tidal_playlist,
-                stop_flag=lambda: self.stop_requested  # 중단 플래그 전달
+                stop_flag=lambda: self.stop_requested,  # 중단 플래그 전달
+                delta_sync=self.delta_sync_check.isChecked(),
+                report_removed=self.report_removed_check.isChecked(),
+                noise_tokens=self.noise_tokens_input.text().split(","),
+                pinned=self.pinned_check.isChecked(),
+                shared_queue=self.shared_queue_check.isChecked(),
+                plan_file=PLAN_FILE if use_plan else None,
+                # 체크하지 않으면 TIDAL_DOWNLOADER_PROFILE 환경 변수를 따름
+                profile=True if self.profile_check.isChecked() else None,
+                profile_sample_thread=self.main_thread_id  # Qt 메인 스레드(UI) 스택 샘플링
             )
         except Exception as e:
             self.log(f"❌ 처리 중 오류 발생: {e}")